@@ -97,12 +97,25 @@ async def startup_event():
         dynamodb_service.ensure_table_exists()
         logger.info("DynamoDB table initialized")
 
+        # Open the first OpenAI realtime connection ahead of any call
+        from .services.realtime_service import realtime_pool
+
+        realtime_pool.warm()
+
         # Log application startup
         logger.info("AI Call Center Evaluator application started successfully")
     except Exception as e:
         logger.error(f"Error during application startup: {str(e)}")
 
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Close idle connections on application shutdown."""
+    from .services.realtime_service import realtime_pool
+
+    await realtime_pool.close()
+
+
 # Include routers
 app.include_router(tests.router)
 app.include_router(reports.router)
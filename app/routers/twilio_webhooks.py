@@ -1,6 +1,6 @@
 # app/routers/twilio_webhooks.py
 import logging
-import json
+import orjson
 
 from fastapi import (
     APIRouter,
@@ -59,7 +59,7 @@ async def websocket_endpoint(websocket: WebSocket, client_id: str):
         while True:
             # Wait for messages from the client
             data = await websocket.receive_text()
-            message = json.loads(data)
+            message = orjson.loads(data)
 
             # Process commands from client
             command = message.get("command")
@@ -100,12 +100,15 @@ async def websocket_endpoint(websocket: WebSocket, client_id: str):
                             "conversation", []
                         )
 
-                    await websocket.send_json(
-                        {
-                            "type": "conversation",
-                            "test_id": test_id,
-                            "turns": conversation,
-                        }
+                    # The whole conversation can be large, serialize it with orjson
+                    await websocket.send_text(
+                        orjson.dumps(
+                            {
+                                "type": "conversation",
+                                "test_id": test_id,
+                                "turns": conversation,
+                            }
+                        ).decode()
                     )
 
             elif command == "end_call":
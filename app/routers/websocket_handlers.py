@@ -1,7 +1,12 @@
 # app/websocket_handlers.py
 from datetime import datetime
-import json
+import io
 import base64
+import binascii
+import re
+import functools
+from collections import deque
+import orjson
 import asyncio
 import logging
 import websockets
@@ -11,7 +16,11 @@ from fastapi import WebSocket, WebSocketDisconnect
 from twilio.rest import Client
 from app.config import app_config
 from app.services.dynamodb_service import dynamodb_service
-from app.utils.audio import trim_silence
+from app.services.evaluator import evaluator_service
+from app.services.realtime_service import realtime_pool
+from app.services.s3_service import RecordingUpload, s3_service
+from app.utils.audio import AudioBuffer, release_audio, trim_silence
+from app.utils.send_queue import SendQueue
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -22,45 +31,216 @@ client = Client(
     password=app_config.TWILIO_AUTH_TOKEN,
 )
 VOICE = "alloy"  # OpenAI voice model
-LOG_EVENT_TYPES = [
-    "response.content.done",
-    "rate_limits.updated",
-    "response.done",
-    "input_audio_buffer.committed",
-    "input_audio_buffer.speech_stopped",
-    "input_audio_buffer.speech_started",
-    "session_created",
-    "conversation.item.input_audio_transcription.failed",
-    "conversation.item.input_audio_transcription.completed",
-]
+# Session settings shared by every call; the instructions are added per test
+SESSION_CONFIG = {
+    "turn_detection": {
+        "type": "server_vad",
+        "silence_duration_ms": 1000,  # Wait longer to detect silence default is 500
+        "threshold": 0.55,  # indicates how sensitive the voice detection is to audio signals, default is 0.5
+    },
+    "input_audio_format": "g711_ulaw",
+    "output_audio_format": "g711_ulaw",
+    "voice": VOICE,
+    "modalities": ["text", "audio"],
+    "temperature": 0.7,
+    "input_audio_transcription": {"model": "whisper-1", "language": "en"},
+}
+# Serialized session.update without its two closing braces
+_SESSION_UPDATE_PREFIX = orjson.dumps(
+    {"type": "session.update", "session": SESSION_CONFIG}
+)[:-2]
+# Realtime audio append message, cut off inside its empty audio string
+AUDIO_APPEND_PREFIX = orjson.dumps(
+    {"type": "input_audio_buffer.append", "audio": ""}
+).decode()[: -len('"}')]
+LOG_EVENT_TYPES = frozenset(
+    {
+        "response.content.done",
+        "rate_limits.updated",
+        "response.done",
+        "input_audio_buffer.committed",
+        "input_audio_buffer.speech_stopped",
+        "input_audio_buffer.speech_started",
+        "session_created",
+        "conversation.item.input_audio_transcription.failed",
+        "conversation.item.input_audio_transcription.completed",
+    }
+)
+
+# Phrases in an evaluator response that mean the call should be ended
+GOODBYE_KEYWORDS = (
+    "goodbye",
+    "bye",
+    "farewell",
+    "take care",
+    "have a good day",
+)
+# Matches any of the keywords anywhere in the text, in a single pass
+GOODBYE_PATTERN = re.compile("|".join(map(re.escape, GOODBYE_KEYWORDS)), re.IGNORECASE)
+
+# Hand the full call recording to its S3 upload every ~2 minutes of g711_ulaw
+RECORDING_CHUNK_BYTES = 1024 * 1024
+# Sized so the delta that crosses the chunk threshold still fits without regrowing
+RECORDING_BUFFER_BYTES = RECORDING_CHUNK_BYTES + 64 * 1024
+
+# Twilio sends 20 ms media frames, forward them to OpenAI 100 ms at a time
+AGENT_APPEND_BYTES = 800
+# Start of every Twilio media message, and the key its audio follows
+TWILIO_MEDIA_PREFIX = '{"event":"media"'
+TWILIO_PAYLOAD_KEY = '"payload":"'
+# Seconds the remaining audio loop may take to finish once the other has ended
+AUDIO_LOOP_GRACE_SECONDS = 5
+# Drop outgoing audio once this much is waiting to be written to Twilio,
+# about 90 seconds of base64 g711_ulaw audio
+TWILIO_SEND_BUFFER_BYTES = 2**20
+
+
+class ConnectionState:
+    """State of an active Twilio media stream connection."""
+
+    __slots__ = (
+        "websocket",
+        "test_id",
+        "call_sid",
+        "connected_at",
+        "openai_ws",
+        "stream_sid",
+    )
+
+    def __init__(self, websocket, test_id, call_sid, openai_ws, stream_sid=None):
+        self.websocket = websocket
+        self.test_id = test_id
+        self.call_sid = call_sid
+        self.connected_at = "connected"
+        self.openai_ws = openai_ws
+        self.stream_sid = stream_sid
+
 
 # Track active WebSocket connections
 active_connections = {}
 
+# Final reports still being generated for calls that have ended
+report_tasks = set()
+
+
+def _run_in_background(tasks: set, coro) -> asyncio.Task:
+    """Schedule a fire-and-forget coroutine, keeping a reference until it finishes."""
+    task = asyncio.create_task(coro)
+    tasks.add(task)
+    task.add_done_callback(tasks.discard)
+    task.add_done_callback(_log_background_failure)
+    return task
+
+
+def _log_background_failure(task: asyncio.Task):
+    """Log the exception of a background task that failed."""
+    if not task.cancelled() and task.exception() is not None:
+        logger.error("Background task failed: %s", task.exception())
+
+
+def _media_message_prefix(stream_sid: str) -> str:
+    """Serialize a Twilio media message for stream_sid, cut off inside its empty payload."""
+    message = {"event": "media", "streamSid": stream_sid, "media": {"payload": ""}}
+    return orjson.dumps(message).decode()[: -len('"}}')]
+
+
+def _mark_message(stream_sid: str) -> str:
+    """Serialize the Twilio mark message sent after each forwarded audio delta."""
+    message = {
+        "event": "mark",
+        "streamSid": stream_sid,
+        "mark": {"name": "responsePart"},
+    }
+    return orjson.dumps(message).decode()
+
+
+def _media_payload(message: str):
+    """
+    Return the audio payload of a Twilio media message without parsing it.
+
+    Media frames make up nearly all of the stream. Twilio writes their event
+    field first and the base64 payload needs no escaping, so the payload can
+    be sliced out directly. Returns None for anything else, which is then
+    parsed as JSON.
+    """
+    if not message.startswith(TWILIO_MEDIA_PREFIX):
+        return None
+    start = message.find(TWILIO_PAYLOAD_KEY)
+    if start < 0:
+        return None
+    start += len(TWILIO_PAYLOAD_KEY)
+    end = message.find('"', start)
+    if end < 0:
+        return None
+    return message[start:end]
+
+
+def _append_turn(active_test: dict, turn: dict):
+    """
+    Append a turn to the conversation, indexing it if its text or audio is still missing.
+
+    A turn whose audio_url is present but None has its audio upload in flight,
+    so it is not indexed as missing audio.
+    """
+    counts = _turn_counts(active_test)
+    conversation = active_test.setdefault("conversation", [])
+    conversation.append(turn)
+    counts[turn["speaker"]] = counts.get(turn["speaker"], 0) + 1
+    pending = active_test.setdefault("last_pending_turn", {}).setdefault(
+        turn["speaker"], {}
+    )
+    if not turn.get("text"):
+        pending["text"] = len(conversation) - 1
+    if "audio_url" not in turn:
+        pending["audio_url"] = len(conversation) - 1
+
+
+def _turn_counts(active_test: dict) -> dict:
+    """Return the number of turns recorded per speaker, counting them once if untracked."""
+    counts = active_test.get("turn_counts")
+    if counts is None:
+        counts = active_test["turn_counts"] = {}
+        for turn in active_test.get("conversation", []):
+            counts[turn["speaker"]] = counts.get(turn["speaker"], 0) + 1
+    return counts
+
+
+def _take_pending_turn(active_test: dict, speaker: str, field: str):
+    """Return the last turn by speaker that is missing field, clearing its index."""
+    index = active_test.get("last_pending_turn", {}).get(speaker, {}).pop(field, None)
+    if index is None:
+        return None
+    return active_test["conversation"][index]
+
+
+async def _record_turn_urls(test_id, turn, transcription, audio_task=None):
+    """Set the URLs of a recorded turn once its transcription and audio are uploaded."""
+    if audio_task is not None:
+        turn["transcription_url"], turn["audio_url"] = await asyncio.gather(
+            transcription, audio_task
+        )
+    else:
+        turn["transcription_url"] = await transcription
+    active_test = evaluator_service.active_tests.get(test_id)
+    if active_test is not None:
+        dynamodb_service.save_test_batched(test_id, active_test)
+
 
 async def save_audio_chunk(audio_data, test_id, call_sid, speaker, turn_number=None):
     """Save an audio chunk to S3 and return the S3 URL."""
     try:
-        from app.services.s3_service import s3_service
-        from app.services.evaluator import evaluator_service
-
         # If turn_number is not provided, try to determine it
         if turn_number is None:
-            if test_id in evaluator_service.active_tests:
-                conversation = evaluator_service.active_tests[test_id].get(
-                    "conversation", []
-                )
+            active_test = evaluator_service.active_tests.get(test_id)
+            if active_test is not None:
                 # Count turns by this speaker
-                turn_number = sum(
-                    1 for turn in conversation if turn.get("speaker") == speaker
-                )
+                turn_number = _turn_counts(active_test).get(speaker, 0)
             else:
                 turn_number = 0
 
         # Save the audio to S3
-        audio_data = trim_silence(audio_data)
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        s3_url = s3_service.save_audio(
+        audio_data = await asyncio.to_thread(trim_silence, audio_data)
+        s3_url = await s3_service.save_audio_async(
             audio_data=audio_data,
             test_id=test_id,
             call_sid=call_sid,
@@ -68,43 +248,41 @@ async def save_audio_chunk(audio_data, test_id, call_sid, speaker, turn_number=N
             speaker=speaker,
         )
 
-        logger.debug(f"Saved audio to S3: {s3_url}")
+        logger.debug("Saved audio to S3: %s", s3_url)
         return s3_url
     except Exception as e:
-        logger.error(f"Error saving audio to S3: {str(e)}")
-        import traceback
-
-        logger.error(traceback.format_exc())
+        logger.exception("Error saving audio to S3: %s", e)
         return None
 
 
+async def save_detached_audio(audio_data, test_id, call_sid, speaker, turn_number=None):
+    """Save detached buffer audio to S3, returning its storage to the pool afterwards."""
+    try:
+        return await save_audio_chunk(
+            audio_data, test_id, call_sid, speaker, turn_number
+        )
+    finally:
+        release_audio(audio_data)
+
+
 async def save_transcription(text, test_id, call_sid, speaker, turn_number=None):
     """Save a transcription to S3 and return the S3 URL, with improved error handling."""
     try:
         if not text or len(text.strip()) == 0:
-            logger.warning(f"Empty transcription provided for {speaker}")
+            logger.warning("Empty transcription provided for %s", speaker)
             return None
 
-        from app.services.s3_service import s3_service
-
         # If turn_number is not provided, try to determine it
         if turn_number is None:
-            from app.services.evaluator import evaluator_service
-
-            if test_id in evaluator_service.active_tests:
-                conversation = evaluator_service.active_tests[test_id].get(
-                    "conversation", []
-                )
+            active_test = evaluator_service.active_tests.get(test_id)
+            if active_test is not None:
                 # Count turns by this speaker
-                turn_number = sum(
-                    1 for turn in conversation if turn.get("speaker") == speaker
-                )
+                turn_number = _turn_counts(active_test).get(speaker, 0)
             else:
                 turn_number = 0
 
         # Save the transcription to S3
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        s3_url = s3_service.save_transcription(
+        s3_url = await s3_service.save_transcription_async(
             transcription=text,
             test_id=test_id,
             call_sid=call_sid,
@@ -113,54 +291,142 @@ async def save_transcription(text, test_id, call_sid, speaker, turn_number=None)
         )
 
         if not s3_url:
-            logger.error(f"Failed to save transcription to S3")
+            logger.error("Failed to save transcription to S3")
             return None
 
-        logger.debug(f"Saved transcription to S3: {s3_url}")
+        logger.debug("Saved transcription to S3: %s", s3_url)
 
         # Also save to conversation directly
-        from app.services.evaluator import evaluator_service
-
-        if test_id in evaluator_service.active_tests:
+        active_test = evaluator_service.active_tests.get(test_id)
+        if active_test is not None:
             # Look for the turn from this speaker without text
-            conversation = evaluator_service.active_tests[test_id].get(
-                "conversation", []
-            )
-            for turn in reversed(conversation):
-                if turn.get("speaker") == speaker and not turn.get("text"):
-                    # Update the turn with text
-                    turn["text"] = text
-                    # Also add the transcription URL
-                    turn["transcription_url"] = s3_url
-                    break
+            turn = _take_pending_turn(active_test, speaker, "text")
+            if turn is not None:
+                # Update the turn with text
+                turn["text"] = text
+                # Also add the transcription URL
+                turn["transcription_url"] = s3_url
 
             # Save to DynamoDB
-            from app.services.dynamodb_service import dynamodb_service
-
-            dynamodb_service.save_test(test_id, evaluator_service.active_tests[test_id])
+            dynamodb_service.save_test_batched(test_id, active_test)
 
         return s3_url
     except Exception as e:
-        logger.error(f"Error saving transcription to S3: {str(e)}")
-        import traceback
-
-        logger.error(traceback.format_exc())
+        logger.exception("Error saving transcription to S3: %s", e)
         return None
 
 
+async def save_conversation_text(conversation, test_id, call_sid, timestamp):
+    """Save the conversation transcript to S3 as text and JSON, recording both URLs on the test."""
+    try:
+        # Write the formatted text straight into an upload buffer
+        formatted_text = io.BytesIO()
+        for index, turn in enumerate(conversation):
+            if index:
+                formatted_text.write(b"\n\n")
+            formatted_text.write(
+                f"{turn['timestamp']} - {turn['speaker']}:\n{turn['text']}".encode(
+                    "utf-8"
+                )
+            )
+        formatted_text.seek(0)
+
+        # Upload the text and the structured data for easier processing together
+        key = f"tests/{test_id}/calls/{call_sid}/full_conversation_text_{timestamp}.txt"
+        json_key = (
+            f"tests/{test_id}/calls/{call_sid}/full_conversation_text_{timestamp}.json"
+        )
+        await asyncio.gather(
+            s3_service.run_in_executor(
+                s3_service.s3_client.put_object,
+                Bucket=s3_service.bucket_name,
+                Key=key,
+                Body=formatted_text,
+                ContentType="text/plain",
+            ),
+            s3_service.run_in_executor(
+                s3_service.s3_client.put_object,
+                Bucket=s3_service.bucket_name,
+                Key=json_key,
+                Body=orjson.dumps(
+                    [
+                        {
+                            "speaker": turn["speaker"],
+                            "text": turn["text"],
+                            "timestamp": turn["timestamp"],
+                        }
+                        for turn in conversation
+                    ]
+                ),
+                ContentType="application/json",
+            ),
+        )
+
+        # Add the text conversation URLs to the test data
+        active_test = evaluator_service.active_tests.get(test_id)
+        if active_test is not None:
+            active_test["full_text_conversation"] = {
+                "text_url": f"s3://{s3_service.bucket_name}/{key}",
+                "json_url": f"s3://{s3_service.bucket_name}/{json_key}",
+            }
+
+            # Save to DynamoDB
+            await dynamodb_service.save_test_async(test_id, active_test)
+
+        logger.debug(
+            "Full text conversation saved to: s3://%s/%s", s3_service.bucket_name, key
+        )
+    except Exception as e:
+        logger.error("Error saving full text conversation: %s", e)
+
+
+async def save_final_agent_audio(audio_data, test_id, call_sid, speaker):
+    """Save the agent's audio left at hang-up and attach it to the last agent turn missing audio."""
+    s3_url = await save_detached_audio(audio_data, test_id, call_sid, speaker)
+
+    active_test = evaluator_service.active_tests.get(test_id)
+    if active_test is not None:
+        # Find the last agent turn without an audio URL
+        turn = _take_pending_turn(active_test, "agent", "audio_url")
+        if turn is not None:
+            turn["audio_url"] = s3_url
+
+        dynamodb_service.save_test_batched(test_id, active_test)
+
+
+def start_full_conversation_recording(test_id, call_sid):
+    """Begin streaming the full call recording to S3."""
+    return RecordingUpload(s3_service, test_id, call_sid)
+
+
+async def save_recording_chunk(recording, audio_data):
+    """Add detached buffer audio to the recording, returning its storage to the pool afterwards."""
+    try:
+        await recording.add_audio(audio_data)
+    finally:
+        release_audio(audio_data)
+
+
+async def generate_final_report(test_id, conversation):
+    """Generate the evaluation report for a finished call."""
+    try:
+        report = await evaluator_service.generate_report_from_conversation(
+            test_id, conversation
+        )
+        logger.info("Final report generated with ID: %s", report.id)
+    except Exception as eval_error:
+        logger.exception("Error during final report generation: %s", eval_error)
+
+
 async def register_connection(
     websocket: WebSocket, test_id: str, call_sid: str, openai_ws
 ):
     """Register a new WebSocket connection"""
     connection_id = f"{call_sid}_{test_id}"
-    active_connections[connection_id] = {
-        "websocket": websocket,
-        "test_id": test_id,
-        "call_sid": call_sid,
-        "connected_at": "connected",
-        "openai_ws": openai_ws,
-    }
-    logger.info(f"Registered new connection: {connection_id}")
+    active_connections[connection_id] = ConnectionState(
+        websocket, test_id, call_sid, openai_ws
+    )
+    logger.info("Registered new connection: %s", connection_id)
     return connection_id
 
 
@@ -170,11 +436,12 @@ async def handle_media_stream(websocket: WebSocket):
     logger.info("WebSocket connection established")
 
     # Create buffers to accumulate audio data by speaker
-    evaluator_audio_buffer = bytearray()
-    agent_audio_buffer = bytearray()
-    full_text_conversation = []
+    evaluator_audio_buffer = AudioBuffer()
+    agent_audio_buffer = AudioBuffer()
     test_id = None
     call_sid = None
+    # Twilio REST context for the call, created once the call SID is known
+    call_context = None
     current_speaker = "agent"
     last_transcription_time = datetime.now()
 
@@ -184,47 +451,52 @@ async def handle_media_stream(websocket: WebSocket):
 
     # Flag to track if full conversation is being recorded
     is_recording_full_conversation = True
-    full_conversation_audio = bytearray()
+    full_conversation_audio = AudioBuffer(RECORDING_BUFFER_BYTES)
+    recording = None
 
     stream_sid = None
     latest_media_timestamp = 0
     last_assistant_item = None
-    mark_queue = []
+    mark_queue = deque()
     response_start_timestamp_twilio = None
     openai_ws = None
-
-    async def send_mark(connection, stream_sid):
-        if stream_sid:
-            mark_event = {
-                "event": "mark",
-                "streamSid": stream_sid,
-                "mark": {"name": "responsePart"},
-            }
-            await connection.send_json(mark_event)
-            mark_queue.append("responsePart")
+    # In-flight uploads and API calls issued from the audio loops
+    pending_writes = set()
+    # Messages for Twilio, sent in order by twilio_writer so the OpenAI loop
+    # never waits on the Twilio socket
+    twilio_queue = SendQueue(TWILIO_SEND_BUFFER_BYTES)
+    writer_task = None
+
+    async def twilio_writer():
+        """Send queued messages to Twilio until the connection closes."""
+        try:
+            await twilio_queue.run(websocket.send_text)
+        except Exception as e:
+            logger.debug("Twilio writer stopped: %s", e)
+
+    def send_mark(mark_message):
+        twilio_queue.put(mark_message)
+        mark_queue.append("responsePart")
 
     try:
         # Connect to OpenAI
-        async with websockets.connect(
-            "wss://api.openai.com/v1/realtime?model=gpt-4o-realtime-preview-2024-12-17",
-            additional_headers={
-                "Authorization": f"Bearer {app_config.OPENAI_API_KEY}",
-                "OpenAI-Beta": "realtime=v1",
-            },
-        ) as openai_ws:
+        async with realtime_pool.acquire() as openai_ws:
             # Initialize the session with a default prompt (we don't have test_id yet)
 
             logger.info("OpenAI session initialized")
 
             # this is a hack to get the test_id customParameter early on, since in twilio it can only be found
             async for message in websocket.iter_text():
-                data = json.loads(message)
+                data = orjson.loads(message)
                 if data["event"] == "start":
                     stream_sid = data["start"]["streamSid"]
                     call_sid = data["start"]["callSid"]
                     test_id = data["start"].get("customParameters", {}).get("test_id")
+                    call_context = client.calls(call_sid)
                     logger.info(
-                        f"Received start event with test_id: {test_id}, call_sid: {call_sid}"
+                        "Received start event with test_id: %s, call_sid: %s",
+                        test_id,
+                        call_sid,
                     )
 
                     await register_connection(websocket, test_id, call_sid, openai_ws)
@@ -233,36 +505,64 @@ async def handle_media_stream(websocket: WebSocket):
 
             async def agent_audio():
                 """Receive audio data from Twilio and send it to the OpenAI Realtime API."""
-                nonlocal stream_sid, latest_media_timestamp, call_sid, test_id, current_speaker, agent_turn_count, full_text_conversation
+                nonlocal stream_sid, latest_media_timestamp, call_sid, test_id, current_speaker, agent_turn_count
+                nonlocal call_context
+                # Decoded frames not yet sent to OpenAI
+                pending_append = bytearray()
+
+                async def flush_append():
+                    """Send the caller audio still waiting for a full append."""
+                    if pending_append and openai_ws.state == State.OPEN:
+                        # The base64 payload needs no JSON escaping
+                        await openai_ws.send(
+                            AUDIO_APPEND_PREFIX
+                            + base64.b64encode(pending_append).decode()
+                            + '"}'
+                        )
+                    pending_append.clear()
+
                 try:
                     async for message in websocket.iter_text():
-                        from app.services.evaluator import evaluator_service
-
-                        data = json.loads(message)
-                        if data["event"] == "media" and openai_ws.state == State.OPEN:
+                        audio_payload = _media_payload(message)
+                        if audio_payload is not None:
+                            event = "media"
+                        else:
+                            data = orjson.loads(message)
+                            event = data["event"]
+                            if event == "media":
+                                audio_payload = data["media"]["payload"]
+                        if event == "stop":
+                            # Forward the end of the caller's audio before hanging up
+                            await flush_append()
+                        if event == "media" and openai_ws.state == State.OPEN:
                             # If switching from evaluator → agent, clear agent buffer immediately
                             current_speaker = "agent"
-                            audio_payload = data["media"]["payload"]
                             try:
-                                audio_bytes = base64.b64decode(audio_payload)
-                                # Append to agent audio buffer
-                                agent_audio_buffer.extend(audio_bytes)
-                            except:
+                                frame = base64.b64decode(audio_payload)
+                            except (binascii.Error, ValueError):
                                 logger.error("Error decoding audio payload")
-                            audio_append = {
-                                "type": "input_audio_buffer.append",
-                                "audio": audio_payload,
-                            }
-                            await openai_ws.send(json.dumps(audio_append))
-                        elif data["event"] == "start":
+                                continue
+                            agent_audio_buffer.extend(frame)
+                            pending_append += frame
+                            if len(pending_append) >= AGENT_APPEND_BYTES:
+                                await flush_append()
+                        elif event == "start":
                             stream_sid = data["start"]["streamSid"]
                             call_sid = data["start"]["callSid"]
                             test_id = (
                                 data["start"].get("customParameters", {}).get("test_id")
                             )
-                            client.calls(call_sid).recordings.create()
+                            call_context = client.calls(call_sid)
+                            # Start the Twilio recording without waiting on the REST call
+                            _run_in_background(
+                                pending_writes,
+                                asyncio.to_thread(call_context.recordings.create),
+                            )
                             logger.info(
-                                f"Incoming stream has started stream_sid: {stream_sid}, call_sid: {call_sid}, test_id:{test_id}"
+                                "Incoming stream has started stream_sid: %s, call_sid: %s, test_id:%s",
+                                stream_sid,
+                                call_sid,
+                                test_id,
                             )
                             latest_media_timestamp = 0
                             last_assistant_item = None
@@ -270,7 +570,8 @@ async def handle_media_stream(websocket: WebSocket):
 
                             if test_id not in evaluator_service.active_tests:
                                 logger.warning(
-                                    f"Test {test_id} not found in active_tests, initializing"
+                                    "Test %s not found in active_tests, initializing",
+                                    test_id,
                                 )
                                 active_test = evaluator_service.active_tests[
                                     test_id
@@ -280,168 +581,132 @@ async def handle_media_stream(websocket: WebSocket):
                                     "start_time": datetime.now().isoformat(),
                                     "conversation": [],
                                 }
-                                dynamodb_service.save_test(test_id, active_test)
+                                dynamodb_service.save_test_batched(test_id, active_test)
 
                             logger.info(
-                                f"Received start event: call_sid={call_sid}, test_id={test_id}"
+                                "Received start event: call_sid=%s, test_id=%s",
+                                call_sid,
+                                test_id,
                             )
-                        elif data["event"] == "mark":
+                        elif event == "mark":
                             if mark_queue:
-                                mark_queue.pop(0)
-                        elif data["event"] == "stop" and test_id and call_sid:
+                                mark_queue.popleft()
+                        elif event == "stop" and test_id and call_sid:
                             logging.error("The caller hungup the call")
 
                             agent_turn_count += 1
                             # Save the accumulated agent audio
                             if len(agent_audio_buffer) > 0:
-                                # Save agent's final audio
-                                s3_url = await save_audio_chunk(
-                                    bytes(agent_audio_buffer),
-                                    test_id,
-                                    call_sid,
-                                    current_speaker,
-                                )
-
-                                # Find the last agent turn and update with audio URL
-                                if test_id in evaluator_service.active_tests:
-                                    conversation = evaluator_service.active_tests[
-                                        test_id
-                                    ].get("conversation", [])
-                                    # Find the last agent turn without an audio URL
-                                    for turn in reversed(conversation):
-                                        if turn["speaker"] == "agent" and not turn.get(
-                                            "audio_url"
-                                        ):
-                                            turn["audio_url"] = s3_url
-                                            break
-
-                                    dynamodb_service.save_test(
+                                # Save agent's final audio as a pending write, so
+                                # teardown waits for it even if this loop is
+                                # cancelled
+                                _run_in_background(
+                                    pending_writes,
+                                    save_final_agent_audio(
+                                        agent_audio_buffer.detach(),
                                         test_id,
-                                        evaluator_service.active_tests[test_id],
-                                    )
+                                        call_sid,
+                                        current_speaker,
+                                    ),
+                                )
 
                 except (WebSocketDisconnect, RuntimeError) as e:
-                    logger.warning(f"agent_audio: WebSocket error: {e}")
+                    logger.warning("agent_audio: WebSocket error: %s", e)
                     if openai_ws.state == State.OPEN:
                         await openai_ws.close()
                         await websocket.close()
                 except Exception as e:
-                    logger.error(f"Error in agent_audio: {str(e)}")
+                    logger.error("Error in agent_audio: %s", e)
                 finally:
+                    try:
+                        await flush_append()
+                    except websockets.exceptions.ConnectionClosed:
+                        pass
                     await websocket.close()
                     await openai_ws.close()
-                    logger.info(f"agent_audio task completed for call {call_sid}")
+                    logger.info("agent_audio task completed for call %s", call_sid)
 
             async def evaluator_audio():
                 """Receive events from the OpenAI Realtime API, send audio back to Twilio."""
                 nonlocal stream_sid, last_assistant_item, response_start_timestamp_twilio, test_id
-                nonlocal current_speaker, evaluator_audio_buffer, full_conversation_audio
-                nonlocal evaluator_turn_count, agent_turn_count, last_transcription_time, full_text_conversation
+                nonlocal current_speaker
+                nonlocal evaluator_turn_count, agent_turn_count, last_transcription_time
+                nonlocal recording
 
                 response_text_buffer = ""
+                # Serialized Twilio media message up to its payload and mark
+                # message, rebuilt only when the stream changes
+                media_prefix_sid = None
+                media_prefix = ""
+                mark_message = ""
 
                 try:
 
-                    async for openai_message in openai_ws:
-                        response = json.loads(openai_message)
-                        if response["type"] in LOG_EVENT_TYPES:
-                            logger.info(f"Received event: {response['type']}")
-
-                        # Handle transcribed input from the agent
-                        if response.get("type") in [
-                            "conversation.item.input_audio_transcription.completed",
-                        ]:
-                            text = response.get("transcript", "")
-                            if text:
-                                current_speaker = "agent"
-                                logger.info(f"Agent transcription from OpenAI: {text}")
-
-                                # Save transcription
-                                transcript_url = await save_transcription(
-                                    text,
-                                    test_id,
-                                    call_sid,
-                                    current_speaker,
-                                    agent_turn_count,
-                                )
-
-                                # Append to full conversation
-                                full_text_conversation.append(
-                                    {
-                                        "speaker": current_speaker,
-                                        "text": text,
-                                        "timestamp": datetime.now().isoformat(),
-                                    }
-                                )
-
-                                # Save audio chunk if available
-                                audio_url = None
-                                if len(agent_audio_buffer) > 100:
-                                    audio_url = await save_audio_chunk(
-                                        bytes(agent_audio_buffer),
-                                        test_id,
-                                        call_sid,
-                                        current_speaker,
-                                        agent_turn_count,
-                                    )
-
-                                    agent_audio_buffer.clear()
-
-                                # Add to conversation history once
-                                turn_data = {
-                                    "speaker": current_speaker,
-                                    "text": text,
-                                    "timestamp": datetime.now().isoformat(),
-                                    "transcription_url": transcript_url,
-                                }
-
-                                if audio_url:
-                                    turn_data["audio_url"] = audio_url
-
-                                from app.services.evaluator import evaluator_service
-                                from app.services.dynamodb_service import (
-                                    dynamodb_service,
-                                )
-
-                                if test_id in evaluator_service.active_tests:
-                                    evaluator_service.active_tests[test_id].setdefault(
-                                        "conversation", []
-                                    ).append(turn_data)
-                                    dynamodb_service.save_test(
-                                        test_id,
-                                        evaluator_service.active_tests[test_id],
-                                    )
-                                    logger.info(f"Saved agent turn: {text[:50]}...")
-                                    agent_turn_count += 1
-
-                        # Handle audio response from AI evaluator
-                        elif response[
-                            "type"
-                        ] == "response.audio.delta" and response.get("delta"):
+                    while True:
+                        try:
+                            # Take frames undecoded, orjson validates the UTF-8
+                            # while parsing
+                            openai_message = await openai_ws.recv(decode=False)
+                        except websockets.exceptions.ConnectionClosedOK:
+                            break
+                        response = orjson.loads(openai_message)
+                        event_type = response["type"]
+                        if event_type in LOG_EVENT_TYPES:
+                            logger.info("Received event: %s", event_type)
+
+                        # Handle audio response from AI evaluator. Branches are ordered by
+                        # how often the events arrive, audio deltas first
+                        if event_type == "response.audio.delta" and response.get(
+                            "delta"
+                        ):
+                            forwarded = False
                             try:
                                 # Set current speaker to evaluator - this is FROM OpenAI TO the call
                                 current_speaker = "evaluator"
 
-                                # Decode audio data
-                                audio_payload = base64.b64decode(response["delta"])
-
-                                # Accumulate evaluator audio data
-                                evaluator_audio_buffer.extend(audio_payload)
+                                # Accumulate evaluator audio data, still base64
+                                # encoded; it is decoded when the turn is saved
+                                delta = response["delta"]
+                                evaluator_audio_buffer.extend_b64(delta)
 
                                 # Also add to full conversation recording
                                 if is_recording_full_conversation:
-                                    full_conversation_audio.extend(audio_payload)
-
-                                # Forward to Twilio
-                                audio_delta = {
-                                    "event": "media",
-                                    "streamSid": stream_sid,
-                                    "media": {"payload": response["delta"]},
-                                }
-                                await websocket.send_json(audio_delta)
+                                    full_conversation_audio.extend_b64(delta)
+                                    if (
+                                        len(full_conversation_audio)
+                                        >= RECORDING_CHUNK_BYTES
+                                    ):
+                                        if recording is None:
+                                            recording = (
+                                                start_full_conversation_recording(
+                                                    test_id, call_sid
+                                                )
+                                            )
+                                        _run_in_background(
+                                            pending_writes,
+                                            save_recording_chunk(
+                                                recording,
+                                                full_conversation_audio.detach(),
+                                            ),
+                                        )
+
+                                # Queue for Twilio, dropping frames only while
+                                # the socket is not keeping up
+                                if media_prefix_sid != stream_sid:
+                                    media_prefix = _media_message_prefix(stream_sid)
+                                    mark_message = _mark_message(stream_sid)
+                                    media_prefix_sid = stream_sid
+                                # The base64 delta needs no JSON escaping
+                                forwarded = twilio_queue.offer(
+                                    media_prefix + delta + '"}}'
+                                )
+                                if not forwarded:
+                                    logger.debug(
+                                        "Twilio connection congested, dropping audio delta"
+                                    )
 
                             except Exception as e:
-                                logger.error(f"Error processing audio data: {e}")
+                                logger.error("Error processing audio data: %s", e)
 
                             if response_start_timestamp_twilio is None:
                                 response_start_timestamp_twilio = latest_media_timestamp
@@ -450,10 +715,27 @@ async def handle_media_stream(websocket: WebSocket):
                             if response.get("item_id"):
                                 last_assistant_item = response["item_id"]
 
-                            await send_mark(websocket, stream_sid)
+                            if forwarded and stream_sid:
+                                send_mark(mark_message)
+
+                        # Handle audio transcript (the text OpenAI is saying)
+                        elif event_type == "response.audio_transcript.delta":
+                            # This is from OpenAI (evaluator)
+                            current_speaker = "evaluator"
+
+                            if "delta" in response:
+                                # Check if delta is a string or object
+                                delta = response["delta"]
+                                if isinstance(delta, str):
+                                    transcript = delta
+                                else:
+                                    transcript = delta.get("text", "")
+
+                                if transcript:
+                                    response_text_buffer += transcript
 
                         # Handle text/content from the evaluator
-                        elif response.get("type") == "response.content_part.added":
+                        elif event_type == "response.content_part.added":
                             # This is from OpenAI (evaluator)
                             current_speaker = "evaluator"
 
@@ -467,112 +749,158 @@ async def handle_media_stream(websocket: WebSocket):
                                     content = content_part.get("text", "")
 
                                 if content:
-                                    logger.info(f"Evaluator content: {content}")
+                                    logger.info("Evaluator content: %s", content)
                                     response_text_buffer += content
 
-                        # Handle audio transcript (the text OpenAI is saying)
-                        elif response.get("type") == "response.audio_transcript.delta":
-                            # This is from OpenAI (evaluator)
-                            current_speaker = "evaluator"
+                        # Handle transcribed input from the agent
+                        elif (
+                            event_type
+                            == "conversation.item.input_audio_transcription.completed"
+                        ):
+                            text = response.get("transcript", "")
+                            if text:
+                                current_speaker = "agent"
+                                logger.info("Agent transcription from OpenAI: %s", text)
+                                timestamp = datetime.now().isoformat()
 
-                            if "delta" in response:
-                                # Check if delta is a string or object
-                                delta = response["delta"]
-                                if isinstance(delta, str):
-                                    transcript = delta
-                                else:
-                                    transcript = delta.get("text", "")
+                                audio_task = None
+                                if len(agent_audio_buffer) > 100:
+                                    audio_task = _run_in_background(
+                                        pending_writes,
+                                        save_detached_audio(
+                                            agent_audio_buffer.detach(),
+                                            test_id,
+                                            call_sid,
+                                            current_speaker,
+                                            agent_turn_count,
+                                        ),
+                                    )
 
-                                if transcript:
-                                    response_text_buffer += transcript
+                                # Add to conversation history once; the URLs are
+                                # filled in when the uploads finish
+                                turn_data = {
+                                    "speaker": current_speaker,
+                                    "text": text,
+                                    "timestamp": timestamp,
+                                    "transcription_url": None,
+                                }
+                                if audio_task:
+                                    turn_data["audio_url"] = None
+                                _run_in_background(
+                                    pending_writes,
+                                    _record_turn_urls(
+                                        test_id,
+                                        turn_data,
+                                        save_transcription(
+                                            text,
+                                            test_id,
+                                            call_sid,
+                                            current_speaker,
+                                            agent_turn_count,
+                                        ),
+                                        audio_task,
+                                    ),
+                                )
+
+                                active_test = evaluator_service.active_tests.get(
+                                    test_id
+                                )
+                                if active_test is not None:
+                                    _append_turn(active_test, turn_data)
+                                    dynamodb_service.save_test_batched(
+                                        test_id, active_test
+                                    )
+                                    if logger.isEnabledFor(logging.INFO):
+                                        logger.info(
+                                            "Saved agent turn: %s...", text[:50]
+                                        )
+                                    agent_turn_count += 1
 
                         # When a response is completed
-                        elif response.get("type") == "response.done":
+                        elif event_type == "response.done":
                             current_speaker = "evaluator"
                             logger.info("Response marked as done")
+                            # Keep the response text for the goodbye check below,
+                            # since the buffer is reset once the turn is recorded
+                            response_text = response_text_buffer
 
                             # Save accumulated evaluator audio if we have any
-                            audio_url = None
+                            audio_task = None
                             if (
                                 len(evaluator_audio_buffer) > 100
                             ):  # Only save if we have meaningful audio
-                                # Save the audio chunk
-                                audio_url = await save_audio_chunk(
-                                    bytes(evaluator_audio_buffer),
-                                    test_id,
-                                    call_sid,
-                                    "evaluator",  # Explicitly use "evaluator" here
-                                    evaluator_turn_count,
+                                # Upload in the background; the URL is collected
+                                # below if a turn is recorded
+                                audio_task = _run_in_background(
+                                    pending_writes,
+                                    save_detached_audio(
+                                        # Hand the audio over and start the next chunk
+                                        evaluator_audio_buffer.detach(),
+                                        test_id,
+                                        call_sid,
+                                        "evaluator",  # Explicitly use "evaluator" here
+                                        evaluator_turn_count,
+                                    ),
                                 )
 
-                                # Clear the buffer for the next chunk
-                                evaluator_audio_buffer.clear()
-
                                 # Increment turn counter
                                 evaluator_turn_count += 1
 
                             # Record the turn with the accumulated text if we have any
                             if response_text_buffer and test_id:
-                                # Save transcription
-                                transcript_url = await save_transcription(
-                                    response_text_buffer,
-                                    test_id,
-                                    call_sid,
-                                    "evaluator",  # Explicitly use "evaluator" here
-                                    evaluator_turn_count - 1,  # Use the last turn count
-                                )
                                 logger.info("*****saving evaluator text*****")
-                                full_text_conversation.append(
-                                    {
-                                        "speaker": "evaluator",
-                                        "text": response_text_buffer,
-                                        "timestamp": datetime.now().isoformat(),
-                                    }
-                                )
-                                # Create turn data with all information
+                                now = datetime.now()
+                                timestamp = now.isoformat()
+                                # Create turn data now; the URLs are filled in
+                                # when the uploads finish
                                 turn_data = {
                                     "speaker": "evaluator",  # Explicitly "evaluator"
                                     "text": response_text_buffer,
-                                    "timestamp": datetime.now().isoformat(),
-                                    "transcription_url": transcript_url,
+                                    "timestamp": timestamp,
+                                    "transcription_url": None,
                                 }
-
-                                if audio_url:
-                                    turn_data["audio_url"] = audio_url
+                                if audio_task:
+                                    turn_data["audio_url"] = None
+                                # Save transcription alongside the audio upload
+                                _run_in_background(
+                                    pending_writes,
+                                    _record_turn_urls(
+                                        test_id,
+                                        turn_data,
+                                        save_transcription(
+                                            response_text_buffer,
+                                            test_id,
+                                            call_sid,
+                                            "evaluator",  # Explicitly use "evaluator" here
+                                            # Use the last turn count
+                                            evaluator_turn_count - 1,
+                                        ),
+                                        audio_task,
+                                    ),
+                                )
 
                                 # Save the turn data ONCE directly to the conversation
-                                from app.services.evaluator import evaluator_service
-
-                                if test_id in evaluator_service.active_tests:
-                                    if (
-                                        "conversation"
-                                        not in evaluator_service.active_tests[test_id]
-                                    ):
-                                        evaluator_service.active_tests[test_id][
-                                            "conversation"
-                                        ] = []
-
+                                active_test = evaluator_service.active_tests.get(
+                                    test_id
+                                )
+                                if active_test is not None:
                                     # Add the turn
-                                    evaluator_service.active_tests[test_id][
-                                        "conversation"
-                                    ].append(turn_data)
+                                    _append_turn(active_test, turn_data)
 
                                     # Save to DynamoDB
-                                    from app.services.dynamodb_service import (
-                                        dynamodb_service,
-                                    )
-
-                                    dynamodb_service.save_test(
-                                        test_id, evaluator_service.active_tests[test_id]
-                                    )
-                                    logger.info(
-                                        f"Saved evaluator turn to conversation: {response_text_buffer[:50]}..."
+                                    dynamodb_service.save_test_batched(
+                                        test_id, active_test
                                     )
+                                    if logger.isEnabledFor(logging.INFO):
+                                        logger.info(
+                                            "Saved evaluator turn to conversation: %s...",
+                                            response_text_buffer[:50],
+                                        )
 
                                 response_text_buffer = ""
 
                                 # Update last transcription time
-                                last_transcription_time = datetime.now()
+                                last_transcription_time = now
 
                             # Clear markers
                             mark_queue.clear()
@@ -580,69 +908,35 @@ async def handle_media_stream(websocket: WebSocket):
                             response_start_timestamp_twilio = None
 
                             # Check if this is a goodbye message
-                            is_goodbye_message = False
-
-                            # First check the text buffer for goodbye keywords
-                            goodbye_keywords = [
-                                "goodbye",
-                                "bye",
-                                "farewell",
-                                "take care",
-                                "have a good day",
-                            ]
-                            message_lower = (
-                                response_text_buffer.lower()
-                                if response_text_buffer
-                                else ""
-                            )
-
-                            if any(
-                                keyword in message_lower for keyword in goodbye_keywords
-                            ):
-                                is_goodbye_message = True
+                            if GOODBYE_PATTERN.search(response_text):
                                 logger.info("Detected goodbye in text content")
-
-                            # Also check audio transcript metadata if available
-                            if not is_goodbye_message:
-                                if any(
-                                    any(
-                                        keyword in content.get("transcript", "").lower()
-                                        for keyword in goodbye_keywords
-                                    )
-                                    for item in response.get("response", {}).get(
-                                        "output", []
-                                    )
-                                    for content in item.get("content", [])
-                                    if content.get("type") == "audio"
-                                ):
-                                    is_goodbye_message = True
-                                    logger.info("Detected goodbye in audio transcript")
-
-                            if is_goodbye_message:
                                 # Add a longer delay to ensure the entire goodbye message is played
                                 # The delay is proportional to the message length
                                 message_length = (
-                                    len(message_lower) if message_lower else 100
+                                    len(response_text) if response_text else 100
                                 )
                                 # Calculate delay: ~100 characters per 3 seconds of speech is a rough estimate
                                 delay_seconds = max(3, min(10, message_length / 30))
 
                                 logger.info(
-                                    f"Detected goodbye message, waiting {delay_seconds} seconds before ending call"
+                                    "Detected goodbye message, waiting %s seconds before ending call",
+                                    delay_seconds,
                                 )
 
                                 # Wait for the message to finish playing before ending the call
                                 await asyncio.sleep(delay_seconds)
 
-                                logger.info(f"Ending call after goodbye: {call_sid}")
-                                call = client.calls(call_sid).update(status="completed")
+                                logger.info("Ending call after goodbye: %s", call_sid)
+                                await asyncio.to_thread(
+                                    call_context.update, status="completed"
+                                )
                                 await websocket.close()
 
                 except (
                     websockets.exceptions.ConnectionClosed,
                     WebSocketDisconnect,
                 ) as e:
-                    logger.error(f"Client disconnected error: {e}")
+                    logger.error("Client disconnected error: %s", e)
                     if (
                         openai_ws.state == State.OPEN
                         or not websocket.client_state.name == "closed"
@@ -650,212 +944,163 @@ async def handle_media_stream(websocket: WebSocket):
                         await websocket.close()
                         await openai_ws.close()
                 except Exception as e:
-                    logger.error(f"Error in evaluator_audio: {e}")
-                    import traceback
-
-                    logger.error(traceback.format_exc())
+                    logger.exception("Error in evaluator_audio: %s", e)
                 finally:
                     await websocket.close()
                     await openai_ws.close()
 
             # Important - run both functions concurrently
-            await asyncio.gather(agent_audio(), evaluator_audio())
+            writer_task = asyncio.create_task(twilio_writer())
+            # Both loops handle their own errors and close both sockets on the
+            # way out, so once either leg ends the other only gets a short
+            # grace period to wind down. Turn saves run as pending writes,
+            # which teardown waits for, so cancelling a loop cannot drop one.
+            audio_tasks = [
+                asyncio.create_task(agent_audio()),
+                asyncio.create_task(evaluator_audio()),
+            ]
+            try:
+                done, pending = await asyncio.wait(
+                    audio_tasks, return_when=asyncio.FIRST_COMPLETED
+                )
+                if pending:
+                    await asyncio.wait(pending, timeout=AUDIO_LOOP_GRACE_SECONDS)
+            finally:
+                for task in audio_tasks:
+                    task.cancel()
+                await asyncio.gather(*audio_tasks, return_exceptions=True)
+            for task in done:
+                task.result()
 
     except Exception as e:
-        logger.error(f"Error in handle_media_stream: {str(e)}")
-        import traceback
-
-        logger.error(f"Traceback: {traceback.format_exc()}")
+        logger.exception("Error in handle_media_stream: %s", e)
     finally:
+        if writer_task is not None:
+            writer_task.cancel()
+        active_connections.pop(f"{call_sid}_{test_id}", None)
+
+        # Let in-flight writes land before the final state is saved
+        if pending_writes:
+            await asyncio.gather(*pending_writes, return_exceptions=True)
+        await dynamodb_service.flush_batch()
+
         # When done, save any remaining audio and complete the test
         if test_id and call_sid:
+            # One clock reading for the test's end time and the transcript keys
+            ended_at = datetime.now()
             logger.info(
-                f"WebSocket connection ended for test_id={test_id}, call_sid={call_sid}"
+                "WebSocket connection ended for test_id=%s, call_sid=%s",
+                test_id,
+                call_sid,
             )
-            if full_text_conversation:
-                try:
-                    # Save full text conversation to S3
-                    from app.services.s3_service import s3_service
-                    from app.services.evaluator import evaluator_service
-
-                    # Convert to formatted text
-                    formatted_text = "\n\n".join(
-                        [
-                            f"{turn['timestamp']} - {turn['speaker']}:\n{turn['text']}"
-                            for turn in full_text_conversation
-                        ]
-                    )
-
-                    # Save to S3
-                    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                    key = f"tests/{test_id}/calls/{call_sid}/full_conversation_text_{timestamp}.txt"
-                    s3_service.s3_client.put_object(
-                        Bucket=s3_service.bucket_name,
-                        Key=key,
-                        Body=formatted_text.encode("utf-8"),
-                        ContentType="text/plain",
-                    )
-
-                    # Also save structured data for easier processing
-                    json_key = f"tests/{test_id}/calls/{call_sid}/full_conversation_text_{timestamp}.json"
-                    s3_service.s3_client.put_object(
-                        Bucket=s3_service.bucket_name,
-                        Key=json_key,
-                        Body=json.dumps(full_text_conversation),
-                        ContentType="application/json",
+            active_test = evaluator_service.active_tests.get(test_id)
+            conversation = (
+                active_test.get("conversation", []) if active_test is not None else []
+            )
+            if active_test is not None and conversation:
+                # Update test status
+                active_test["status"] = "completed"
+                active_test["end_time"] = ended_at.isoformat()
+
+            # Upload any remaining audio and the full recording while the
+            # transcript is saved
+            uploads = []
+            if len(agent_audio_buffer) > 100:
+                uploads.append(
+                    save_audio_chunk(
+                        agent_audio_buffer.view(),
+                        test_id,
+                        call_sid,
+                        "agent",
+                        agent_turn_count,
                     )
+                )
 
-                    # Add the text conversation URLs to the test data
-                    if test_id in evaluator_service.active_tests:
-                        evaluator_service.active_tests[test_id][
-                            "full_text_conversation"
-                        ] = {
-                            "text_url": f"s3://{s3_service.bucket_name}/{key}",
-                            "json_url": f"s3://{s3_service.bucket_name}/{json_key}",
-                        }
-
-                        # Save to DynamoDB
-                        dynamodb_service.save_test(
-                            test_id, evaluator_service.active_tests[test_id]
-                        )
-
-                    logger.debug(
-                        f"Full text conversation saved to: s3://{s3_service.bucket_name}/{key}"
+            if len(evaluator_audio_buffer) > 100:
+                uploads.append(
+                    save_audio_chunk(
+                        evaluator_audio_buffer.view(),
+                        test_id,
+                        call_sid,
+                        "evaluator",
+                        evaluator_turn_count,
                     )
-                except Exception as e:
-                    logger.error(f"Error saving full text conversation: {str(e)}")
-
-            # Save any remaining audio in buffers
-            if len(agent_audio_buffer) > 100:
-                await save_audio_chunk(
-                    bytes(agent_audio_buffer),
-                    test_id,
-                    call_sid,
-                    "agent",
-                    agent_turn_count,
                 )
 
-            if len(evaluator_audio_buffer) > 100:
-                await save_audio_chunk(
-                    bytes(evaluator_audio_buffer),
+            # Save the full conversation recording if available
+            if is_recording_full_conversation and (
+                recording is not None or len(full_conversation_audio) > 1000
+            ):
+                if recording is None:
+                    recording = start_full_conversation_recording(test_id, call_sid)
+                uploads.append(recording.finish(full_conversation_audio.view()))
+            uploads = [asyncio.ensure_future(upload) for upload in uploads]
+
+            # The transcript save writes the test's final state to DynamoDB,
+            # which has to land before the report writes its own update
+            if conversation:
+                await save_conversation_text(
+                    conversation,
                     test_id,
                     call_sid,
-                    "evaluator",
-                    evaluator_turn_count,
+                    ended_at.strftime("%Y%m%d_%H%M%S"),
                 )
 
-            # Save the full conversation recording if available
-            if is_recording_full_conversation and len(full_conversation_audio) > 1000:
-                try:
-                    import audioop
-                    import wave
-                    import io
-                    from app.services.s3_service import s3_service
-
-                    full_audio = trim_silence(full_conversation_audio)
-                    # full_audio = full_conversation_audio
-                    # Convert audio to proper WAV format
-                    try:
-                        # Convert from ulaw to linear PCM
-                        pcm_audio = audioop.ulaw2lin(
-                            bytes(full_audio), 2
-                        )  # 2 bytes = 16 bits PCM
-
-                        # Create WAV file in memory
-                        wav_buffer = io.BytesIO()
-                        with wave.open(wav_buffer, "wb") as wav_file:
-                            wav_file.setnchannels(1)  # Mono channel
-                            wav_file.setsampwidth(2)  # 16 bits PCM = 2 bytes
-                            wav_file.setframerate(8000)  # 8kHz sampling rate for G711
-                            # Write audio frames
-                            wav_file.writeframes(pcm_audio)
-
-                        # Get the WAV file content
-                        wav_data = wav_buffer.getvalue()
-                        logger.info(
-                            f"Successfully converted full conversation audio to proper WAV format, size: {len(wav_data)} bytes"
-                        )
-                    except Exception as conv_error:
-                        logger.error(
-                            f"Error converting audio format: {str(conv_error)}"
-                        )
-                        # Fallback to raw audio data if conversion fails
-                        wav_data = bytes(full_audio)
-                        logger.warning(
-                            f"Using raw audio data instead, size: {len(wav_data)} bytes"
-                        )
-
-                    # Save to S3
-                    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                    key = f"tests/{test_id}/calls/{call_sid}/full_conversation_{timestamp}.wav"
-                    s3_service.s3_client.put_object(
-                        Bucket=s3_service.bucket_name,
-                        Key=key,
-                        Body=wav_data,
-                        ContentType="audio/wav",
-                    )
-
-                    # Store the S3 URL in the test data
-                    full_recording_url = f"s3://{s3_service.bucket_name}/{key}"
-                    logger.debug(
-                        f"Full conversation recording saved to: {full_recording_url}"
-                    )
-
-                except Exception as e:
-                    logger.error(f"Error saving full conversation recording: {str(e)}")
-                    import traceback
-
-                    logger.error(traceback.format_exc())
-
             # Process the call to generate evaluation report
             try:
-                from app.services.evaluator import evaluator_service
-
-                if test_id in evaluator_service.active_tests:
-                    conversation = evaluator_service.active_tests[test_id].get(
-                        "conversation", []
-                    )
-
+                if active_test is not None:
                     if conversation:
                         logger.info(
-                            f"Found {len(conversation)} conversation turns for test {test_id}"
+                            "Found %s conversation turns for test %s",
+                            len(conversation),
+                            test_id,
                         )
 
-                        # Debug log the conversation content
-                        for i, turn in enumerate(conversation):
-                            logger.info(
-                                f"Turn {i}: {turn.get('speaker')} - {turn.get('text')[:50]}..."
+                        # Debug log the conversation content as a single record
+                        if logger.isEnabledFor(logging.DEBUG):
+                            logger.debug(
+                                "Conversation turns: %s",
+                                [
+                                    {
+                                        "i": i,
+                                        "speaker": turn.get("speaker"),
+                                        "text": (turn.get("text") or "")[:50],
+                                        "audio_url": turn.get("audio_url"),
+                                        "transcription_url": turn.get(
+                                            "transcription_url"
+                                        ),
+                                    }
+                                    for i, turn in enumerate(conversation)
+                                ],
                             )
-                            if "audio_url" in turn:
-                                logger.debug(f"  Audio URL: {turn.get('audio_url')}")
-                            if "transcription_url" in turn:
-                                logger.debug(
-                                    f"  Transcript URL: {turn.get('transcription_url')}"
-                                )
 
-                        # Update test status
-                        evaluator_service.active_tests[test_id]["status"] = "completed"
-                        evaluator_service.active_tests[test_id][
-                            "end_time"
-                        ] = datetime.now().isoformat()
-
-                        # Force a successful report generation
-                        logger.info(f"Generating final report for test {test_id}")
-                        report = (
-                            await evaluator_service.generate_report_from_conversation(
-                                test_id, conversation
-                            )
+                        # Generate the report after the connection has been
+                        # torn down rather than holding it open for the evaluation
+                        logger.info("Generating final report for test %s", test_id)
+                        _run_in_background(
+                            report_tasks, generate_final_report(test_id, conversation)
                         )
-                        logger.info(f"Final report generated with ID: {report.id}")
                     else:
-                        logger.error(f"No conversation turns found for test {test_id}")
+                        logger.error("No conversation turns found for test %s", test_id)
                 else:
-                    logger.error(f"Test {test_id} not found in active_tests")
+                    logger.error("Test %s not found in active_tests", test_id)
             except Exception as eval_error:
-                logger.error(f"Error during final report generation: {str(eval_error)}")
-                import traceback
-
-                logger.error(f"Evaluation error traceback: {traceback.format_exc()}")
+                logger.exception("Error during final report generation: %s", eval_error)
+
+            # The report runs in the background, so these uploads overlap
+            # with the evaluation rather than delaying it
+            if uploads:
+                for result in await asyncio.gather(*uploads, return_exceptions=True):
+                    if isinstance(result, Exception):
+                        logger.error("Error uploading call data: %s", result)
+
+        # Hand the buffer storage back for the next call
+        for buffer in (
+            agent_audio_buffer,
+            evaluator_audio_buffer,
+            full_conversation_audio,
+        ):
+            buffer.release()
 
     async def handle_speech_started_event():
         nonlocal response_start_timestamp_twilio, last_assistant_item
@@ -864,11 +1109,16 @@ async def handle_media_stream(websocket: WebSocket):
             elapsed_time = latest_media_timestamp - response_start_timestamp_twilio
 
             logger.info(
-                f"Calculating elapsed time for truncation: {latest_media_timestamp} - {response_start_timestamp_twilio} = {elapsed_time}ms"
+                "Calculating elapsed time for truncation: %s - %s = %sms",
+                latest_media_timestamp,
+                response_start_timestamp_twilio,
+                elapsed_time,
             )
             if last_assistant_item:
                 logger.info(
-                    f"Truncating item with ID: {last_assistant_item}, Truncated at: {elapsed_time}ms"
+                    "Truncating item with ID: %s, Truncated at: %sms",
+                    last_assistant_item,
+                    elapsed_time,
                 )
 
                 truncate_event = {
@@ -877,9 +1127,13 @@ async def handle_media_stream(websocket: WebSocket):
                     "content_index": 0,
                     "audio_end_ms": elapsed_time,
                 }
-                await openai_ws.send(json.dumps(truncate_event))
+                await openai_ws.send(orjson.dumps(truncate_event).decode())
 
-            await websocket.send_json({"event": "clear", "streamSid": stream_sid})
+            # Audio still queued for Twilio belongs to the interrupted response
+            twilio_queue.clear()
+            twilio_queue.put(
+                orjson.dumps({"event": "clear", "streamSid": stream_sid}).decode()
+            )
 
             mark_queue.clear()
             last_assistant_item = None
@@ -890,29 +1144,14 @@ async def handle_media_stream(websocket: WebSocket):
 async def update_stream_sid(connection_id: str, stream_sid: str):
     """Update the stream_sid for a connection"""
     if connection_id in active_connections:
-        active_connections[connection_id]["stream_sid"] = stream_sid
-        logger.error(f"Updated stream_sid for connection {connection_id}: {stream_sid}")
+        active_connections[connection_id].stream_sid = stream_sid
+        logger.debug(
+            "Updated stream_sid for connection %s: %s", connection_id, stream_sid
+        )
 
 
 async def initialize_session(openai_ws, test_id):
-
-    session_update = {
-        "type": "session.update",
-        "session": {
-            "turn_detection": {
-                "type": "server_vad",
-                "silence_duration_ms": 1000,  # Wait longer to detect silence default is 500
-                "threshold": 0.55,  # indicates how sensitive the voice detection is to audio signals, default is 0.5
-            },
-            "input_audio_format": "g711_ulaw",
-            "output_audio_format": "g711_ulaw",
-            "voice": VOICE,
-            "instructions": _create_system_prompt(test_id),
-            "modalities": ["text", "audio"],
-            "temperature": 0.7,
-            "input_audio_transcription": {"model": "whisper-1", "language": "en"},
-        },
-    }
+    session_update = _session_update_message(_create_system_prompt(test_id))
 
     # "tools": [
     #     {
@@ -928,24 +1167,41 @@ async def initialize_session(openai_ws, test_id):
     # ],
     # "tool_choice": "auto",
 
-    await openai_ws.send(json.dumps(session_update))
+    await openai_ws.send(session_update)
     # await send_initial_conversation_item(openai_ws)
 
 
-def _create_system_prompt(test_id) -> str:
-    """Create a system prompt based on persona, behavior, and question."""
-    # Import knowledge base
-    from app.services.evaluator import evaluator_service
+def _session_update_message(instructions: str) -> str:
+    """Serialize the session update for a system prompt."""
+    # Only the instructions vary per test, so they are spliced into the
+    # pre-serialized session update
+    return (
+        _SESSION_UPDATE_PREFIX
+        + b',"instructions":'
+        + orjson.dumps(instructions)
+        + b"}}"
+    ).decode()
 
-    test_case = evaluator_service.active_tests[test_id]["test_case"]
-    persona_name = test_case["config"]["persona_name"]
-    behavior_name = test_case["config"]["behavior_name"]
-    question = test_case["config"]["question"]
 
+def _create_system_prompt(test_id) -> str:
+    """Create a system prompt based on persona, behavior, and question."""
+    config = evaluator_service.active_tests[test_id]["test_case"]["config"]
+    return _build_prompt(
+        config["persona_name"],
+        config["behavior_name"],
+        config["question"],
+        config["special_instructions"],
+        config["max_turns"],
+    )
+
+
+@functools.lru_cache(maxsize=256)
+def _build_prompt(
+    persona_name, behavior_name, question, special_instructions, max_turns
+) -> str:
+    """Build the system prompt for a test configuration, memoized per configuration."""
     persona_traits = ", ".join(app_config.get_persona_traits(persona_name))
     behavior_chars = ", ".join(app_config.get_behavior_characteristics(behavior_name))
-    special_instructions = test_case["config"]["special_instructions"]
-    max_turns = test_case["config"]["max_turns"]
     return f"""
         You are a customer calling a customer support center. You have a specific problem you're trying to resolve. Your persona is: {persona_name}, characterized by the traits: {persona_traits}.
 
@@ -989,5 +1245,5 @@ async def send_initial_conversation_item(openai_ws):
             ],
         },
     }
-    await openai_ws.send(json.dumps(initial_conversation_item))
-    await openai_ws.send(json.dumps({"type": "response.create"}))
+    await openai_ws.send(orjson.dumps(initial_conversation_item).decode())
+    await openai_ws.send(orjson.dumps({"type": "response.create"}).decode())
@@ -1,9 +1,13 @@
 # app/services/dynamodb_service.py
 import json
+import time
+import asyncio
+import threading
 import boto3
 import logging
 from datetime import datetime
-from typing import Dict, Any, Optional
+from itertools import islice
+from typing import Dict, Any, List, Optional
 from botocore.exceptions import ClientError
 
 logger = logging.getLogger(__name__)
@@ -14,10 +18,30 @@ class DynamoDBService:
 
     from app.config import app_config
 
+    # BatchWriteItem accepts at most 25 put requests per call
+    BATCH_SIZE = 25
+    # Seconds a queued save waits for others to join its batch
+    BATCH_INTERVAL = 0.5
+    BATCH_MAX_ATTEMPTS = 5
+    # Statuses after which a test is not saved during a call again
+    TERMINAL_STATUSES = frozenset({"completed", "failed"})
+
     def __init__(self, table_name=app_config.FULL_S3_BUCKET_NAME):
         self.table_name = table_name
         self.dynamodb = boto3.resource("dynamodb")
         self.table = self.dynamodb.Table(table_name)
+        # Items waiting for the next batch write, keyed by test ID so only the
+        # latest state of each test is written
+        self._batch: Dict[str, Dict[str, Any]] = {}
+        self._batch_timer: Optional[asyncio.Task] = None
+        self._batch_flushes = set()
+        # Set once the batch holding each test has been written, for test IDs
+        # whose batch is being written on a worker thread
+        self._batch_in_flight: Dict[str, threading.Event] = {}
+        # Created on first use so it belongs to the running event loop
+        self._batch_lock: Optional[asyncio.Lock] = None
+        # Hash of the test data most recently sent to DynamoDB for each test
+        self._written_hashes: Dict[str, int] = {}
 
     def ensure_table_exists(self):
         """Ensure the DynamoDB table exists, create it if it doesn't."""
@@ -58,20 +82,191 @@ class DynamoDBService:
             True if successful, False otherwise
         """
         try:
-            logger.debug(f"Saving test {test_id} to DynamoDB")
+            item = self._build_test_item(test_id, test_data)
+        except Exception as e:
+            logger.error(f"Error serializing test {test_id} for DynamoDB: {str(e)}")
+            return False
+        self._supersede_batched(test_id)
+        if not self._is_changed(test_id, item):
+            return True
+        return self._put_test_item(test_id, item)
+
+    async def save_test_async(self, test_id: str, test_data: Dict[str, Any]) -> bool:
+        """
+        Save test data to DynamoDB without blocking the event loop.
+
+        The item is serialized before the write is handed to a worker thread,
+        so later changes to test_data are not picked up by this write.
+
+        Args:
+            test_id: The test ID
+            test_data: The test data dictionary
+
+        Returns:
+            True if successful, False otherwise
+        """
+        try:
+            item = self._build_test_item(test_id, test_data)
+        except Exception as e:
+            logger.error(f"Error serializing test {test_id} for DynamoDB: {str(e)}")
+            return False
+        written = self._supersede_batched(test_id, wait=False)
+        if written is not None:
+            await asyncio.to_thread(written.wait)
+        if not self._is_changed(test_id, item):
+            return True
+        return await asyncio.to_thread(self._put_test_item, test_id, item)
+
+    def save_test_batched(self, test_id: str, test_data: Dict[str, Any]) -> bool:
+        """
+        Queue test data for the next batched DynamoDB write.
+
+        Must be called from the event loop. Saves of the same test made before
+        the batch is written are coalesced into the latest one. The queue is
+        written once it holds BATCH_SIZE tests, or BATCH_INTERVAL seconds
+        after the first save was queued.
+
+        Args:
+            test_id: The test ID
+            test_data: The test data dictionary
+
+        Returns:
+            True if the save was queued, False if the data could not be serialized
+        """
+        try:
+            item = self._build_test_item(test_id, test_data)
+        except Exception as e:
+            logger.error(f"Error serializing test {test_id} for DynamoDB: {str(e)}")
+            return False
+
+        if not self._is_changed(test_id, item):
+            return True
+        self._batch[test_id] = item
+        if len(self._batch) >= self.BATCH_SIZE:
+            task = asyncio.create_task(self.flush_batch())
+            self._batch_flushes.add(task)
+            task.add_done_callback(self._batch_flushes.discard)
+        elif self._batch_timer is None:
+            self._batch_timer = asyncio.create_task(self._flush_batch_later())
+        return True
+
+    async def _flush_batch_later(self):
+        await asyncio.sleep(self.BATCH_INTERVAL)
+        self._batch_timer = None
+        await self.flush_batch()
+
+    async def flush_batch(self):
+        """Write every queued test item to DynamoDB, BATCH_SIZE items per request."""
+        if self._batch_lock is None:
+            self._batch_lock = asyncio.Lock()
+        async with self._batch_lock:
+            while self._batch:
+                test_ids = list(islice(self._batch, self.BATCH_SIZE))
+                items = [self._batch.pop(test_id) for test_id in test_ids]
+                written = threading.Event()
+                for test_id in test_ids:
+                    self._batch_in_flight[test_id] = written
+                try:
+                    await asyncio.to_thread(self._write_batch, items, written)
+                finally:
+                    for test_id in test_ids:
+                        if self._batch_in_flight.get(test_id) is written:
+                            del self._batch_in_flight[test_id]
+
+    def _write_batch(self, items: List[Dict[str, Any]], written: threading.Event):
+        """Write a batch on a worker thread, signalling direct writes waiting on it."""
+        try:
+            return self._batch_write_items(items)
+        finally:
+            written.set()
+
+    def _supersede_batched(
+        self, test_id: str, wait: bool = True
+    ) -> Optional[threading.Event]:
+        """
+        Keep a batched snapshot of a test from landing after a direct write.
+
+        A snapshot still queued is dropped, since the direct write carries a
+        newer state, and its recorded hash is forgotten so that write is not
+        skipped as unchanged. A snapshot already being written is waited for
+        when wait is set; otherwise its event is returned to wait on.
+        """
+        if self._batch.pop(test_id, None) is not None:
+            self._written_hashes.pop(test_id, None)
+        written = self._batch_in_flight.get(test_id)
+        if written is not None and wait:
+            written.wait()
+            return None
+        return written
+
+    def _batch_write_items(self, items: List[Dict[str, Any]]) -> bool:
+        """Write prepared test items with BatchWriteItem, retrying unprocessed ones."""
+        requests = [{"PutRequest": {"Item": item}} for item in items]
+        for attempt in range(self.BATCH_MAX_ATTEMPTS):
+            try:
+                response = self.dynamodb.meta.client.batch_write_item(
+                    RequestItems={self.table_name: requests}
+                )
+            except Exception as e:
+                logger.error(f"Error batch saving tests to DynamoDB: {str(e)}")
+                import traceback
+
+                logger.error(f"Traceback: {traceback.format_exc()}")
+                self._forget_written(items)
+                return False
+
+            requests = response.get("UnprocessedItems", {}).get(self.table_name, [])
+            if not requests:
+                logger.debug(f"Saved {len(items)} tests to DynamoDB")
+                return True
+            # Back off before retrying items DynamoDB throttled
+            time.sleep(0.05 * 2**attempt)
+
+        logger.error(f"{len(requests)} tests were not saved to DynamoDB after retries")
+        self._forget_written(request["PutRequest"]["Item"] for request in requests)
+        return False
 
+    def _is_changed(self, test_id: str, item: Dict[str, Any]) -> bool:
+        """
+        Check whether a test item differs from the last one sent for the test.
+
+        The item is recorded as sent, so identical saves that follow are
+        skipped. Failed writes are forgotten so the next save retries them.
+        Finished tests are only saved a few more times, so their hashes are
+        dropped rather than kept for the life of the process.
+        """
+        if item["status"] in self.TERMINAL_STATUSES:
+            self._written_hashes.pop(test_id, None)
+            return True
+        data_hash = hash(item["test_data"])
+        if self._written_hashes.get(test_id) == data_hash:
+            logger.debug(f"Test {test_id} unchanged, skipping DynamoDB write")
+            return False
+        self._written_hashes[test_id] = data_hash
+        return True
+
+    def _forget_written(self, items):
+        """Drop the recorded hashes of items whose write failed."""
+        for item in items:
+            self._written_hashes.pop(item["test_id"], None)
+
+    def _build_test_item(
+        self, test_id: str, test_data: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Build the DynamoDB item for a test."""
+        return {
+            "test_id": test_id,
             # Convert any non-serializable objects to strings
-            test_data_json = json.dumps(test_data, default=str)
-
-            # Store in DynamoDB
-            self.table.put_item(
-                Item={
-                    "test_id": test_id,
-                    "test_data": test_data_json,
-                    "created_at": datetime.now().isoformat(),
-                    "status": test_data.get("status", "unknown"),
-                }
-            )
+            "test_data": json.dumps(test_data, default=str),
+            "created_at": datetime.now().isoformat(),
+            "status": test_data.get("status", "unknown"),
+        }
+
+    def _put_test_item(self, test_id: str, item: Dict[str, Any]) -> bool:
+        """Write a prepared test item to DynamoDB."""
+        try:
+            logger.debug(f"Saving test {test_id} to DynamoDB")
+            self.table.put_item(Item=item)
             logger.debug(f"Test {test_id} saved to DynamoDB")
             return True
         except Exception as e:
@@ -79,6 +274,7 @@ class DynamoDBService:
             import traceback
 
             logger.error(f"Traceback: {traceback.format_exc()}")
+            self._forget_written([item])
             return False
 
     def get_test(self, test_id: str) -> Optional[Dict[str, Any]]:
@@ -118,6 +314,11 @@ class DynamoDBService:
         Returns:
             True if successful, False otherwise
         """
+        # Write any queued snapshot first so it cannot overwrite the status later
+        queued = self._batch.pop(test_id, None)
+        self._supersede_batched(test_id)
+        if queued is not None:
+            self._put_test_item(test_id, queued)
         try:
             logger.debug(f"Updating test {test_id} status to {status} in DynamoDB")
             response = self.table.update_item(
@@ -127,6 +328,8 @@ class DynamoDBService:
                 ExpressionAttributeValues={":status": status},
                 ReturnValues="UPDATED_NEW",
             )
+            # The stored item no longer matches the last save
+            self._written_hashes.pop(test_id, None)
             logger.debug(f"Updated test {test_id} status in DynamoDB")
             return True
         except Exception as e:
@@ -146,6 +349,7 @@ class DynamoDBService:
         try:
             logger.error(f"DEBUG: Deleting test {test_id} from DynamoDB")
             self.table.delete_item(Key={"test_id": test_id})
+            self._written_hashes.pop(test_id, None)
             logger.error(f"DEBUG: Deleted test {test_id} from DynamoDB")
             return True
         except Exception as e:
@@ -0,0 +1,103 @@
+# app/services/realtime_service.py
+import time
+import asyncio
+import logging
+import websockets
+from collections import deque
+from contextlib import asynccontextmanager
+from websockets.protocol import State
+from app.config import app_config
+
+logger = logging.getLogger(__name__)
+
+REALTIME_URL = (
+    "wss://api.openai.com/v1/realtime?model=gpt-4o-realtime-preview-2024-12-17"
+)
+REALTIME_MAX_MESSAGE_SIZE = 16 * 2**20
+
+
+class RealtimeConnectionPool:
+    """
+    Keeps OpenAI Realtime connections open ahead of incoming calls.
+
+    A realtime session keeps its conversation history for the lifetime of the
+    connection, so connections are handed out once and closed after the call
+    rather than returned to the pool. The pool only saves the TLS and
+    websocket handshake on the call path by opening the next connection in
+    the background.
+    """
+
+    def __init__(self, size: int = 1, max_idle: float = 300.0):
+        """
+        Args:
+            size: Number of connections to keep open and idle
+            max_idle: Seconds an idle connection may wait before it is discarded
+        """
+        self.size = size
+        self.max_idle = max_idle
+        self._idle = deque()
+        self._opening = set()
+
+    async def _connect(self):
+        return await websockets.connect(
+            REALTIME_URL,
+            additional_headers={
+                "Authorization": f"Bearer {app_config.OPENAI_API_KEY}",
+                "OpenAI-Beta": "realtime=v1",
+            },
+            # Audio is base64 encoded and does not deflate usefully
+            compression=None,
+            # Long responses can exceed the 1 MiB default in a single event
+            max_size=REALTIME_MAX_MESSAGE_SIZE,
+            # Let audio appends queue up before send() waits for the socket
+            write_limit=2**20,
+        )
+
+    def warm(self):
+        """Open connections in the background until the pool is full."""
+        for _ in range(self.size - len(self._idle) - len(self._opening)):
+            task = asyncio.create_task(self._open_idle())
+            self._opening.add(task)
+            task.add_done_callback(self._opening.discard)
+
+    async def _open_idle(self):
+        try:
+            connection = await self._connect()
+        except Exception as e:
+            logger.warning(f"Could not pre-open OpenAI realtime connection: {str(e)}")
+            return
+        self._idle.append((time.monotonic(), connection))
+
+    async def _take(self):
+        """Return a live idle connection, or open a new one if none is ready."""
+        while self._idle:
+            opened_at, connection = self._idle.popleft()
+            if (
+                connection.state == State.OPEN
+                and time.monotonic() - opened_at < self.max_idle
+            ):
+                return connection
+            await connection.close()
+        return await self._connect()
+
+    @asynccontextmanager
+    async def acquire(self):
+        """Yield an open realtime connection for a single call, closing it afterwards."""
+        connection = await self._take()
+        self.warm()
+        try:
+            yield connection
+        finally:
+            await connection.close()
+
+    async def close(self):
+        """Close all idle connections."""
+        for task in list(self._opening):
+            task.cancel()
+        while self._idle:
+            _, connection = self._idle.popleft()
+            await connection.close()
+
+
+# Create a singleton instance
+realtime_pool = RealtimeConnectionPool()
@@ -1,21 +1,48 @@
 # app/services/s3_service.py
 import json
+import time
+import asyncio
+import functools
 import logging
 import boto3
 from botocore.exceptions import ClientError
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any, List, Union, BinaryIO
 from datetime import datetime
-import io
-import wave
+import struct
 import audioop
+from app.utils.audio import audible_range
 
 
 logger = logging.getLogger(__name__)
 
 
+def wav_header(data_size: int) -> bytes:
+    """Build the 44 byte header of a mono 16 bit 8kHz PCM WAV file."""
+    return struct.pack(
+        "<4sI4s4sIHHIIHH4sI",
+        b"RIFF",
+        36 + data_size,
+        b"WAVE",
+        b"fmt ",
+        16,  # fmt chunk size
+        1,  # PCM
+        1,  # Mono channel
+        8000,  # 8kHz sampling rate for G711
+        8000 * 2,  # Byte rate
+        2,  # Block align
+        16,  # 16 bits PCM
+        b"data",
+        data_size,
+    )
+
+
 class S3Service:
     """Service for interacting with AWS S3 for storage."""
 
+    # Upload threads, kept below the S3 client's default pool of 10 connections
+    UPLOAD_WORKERS = 8
+
     def __init__(self):
         from app.config import app_config
 
@@ -26,10 +53,21 @@ class S3Service:
             region_name=self.region_name,
             endpoint_url=f"https://s3.{self.region_name}.amazonaws.com",
         )
+        # Uploads get their own threads so they neither starve nor wait on the
+        # other blocking work sent to the default executor
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.UPLOAD_WORKERS, thread_name_prefix="s3-upload"
+        )
+
+    async def run_in_executor(self, func, *args, **kwargs):
+        """Run a blocking S3 call on the upload threads and await its result."""
+        return await asyncio.get_running_loop().run_in_executor(
+            self._executor, functools.partial(func, *args, **kwargs)
+        )
 
     def save_audio(
         self,
-        audio_data: Union[bytes, BinaryIO],
+        audio_data: Union[bytes, memoryview, BinaryIO],
         test_id: str,
         call_sid: str,
         turn_number: int,
@@ -39,7 +77,7 @@ class S3Service:
         Enhanced function to save audio data to S3 with improved error handling.
 
         Args:
-            audio_data: Audio data as bytes or file-like object
+            audio_data: Audio data as bytes, a memoryview or file-like object
             test_id: Test case ID
             call_sid: Call SID
             turn_number: Conversation turn number
@@ -52,31 +90,19 @@ class S3Service:
             logger.error("Missing test_id when saving transcription")
             return ""
 
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        timestamp = time.strftime("%Y%m%d_%H%M%S")
         filename = f"{turn_number}_{speaker}_{timestamp}.wav"
         key = f"tests/{test_id}/calls/{call_sid}/audio/{filename}"
         try:
             logger.debug(f"Saving audio to S3: bucket={self.bucket_name}, key={key}")
 
             pcm_audio = audioop.ulaw2lin(audio_data, 2)  # 2 bytes = 16 bits PCM
-            wav_buffer = io.BytesIO()
-            with wave.open(wav_buffer, "wb") as wav_file:
-                wav_file_format = "g711_ulaw"
-                wav_file_sample_rate = 8000  # Sampling rate: 8000 Hz
-                wav_sample_width = 2  # For G711 u-law, 16 bits PCM is standard
-
-                wav_file.setnchannels(1)  # Mono channel
-                wav_file.setsampwidth(wav_sample_width)
-                wav_file.setframerate(wav_file_sample_rate)
-                # Write audio frames
-                wav_file.writeframes(pcm_audio)
-
-            wav_data = wav_buffer.getvalue()
 
+            # A one-shot mono file only needs the fixed 44 byte header in front
             self.s3_client.put_object(
                 Bucket=self.bucket_name,
                 Key=key,
-                Body=wav_data,
+                Body=wav_header(len(pcm_audio)) + pcm_audio,
                 ContentType="audio/wav",
             )
             # Return S3 URL
@@ -87,6 +113,31 @@ class S3Service:
             logger.error(f"Error saving audio to S3: {str(e)}")
             return ""
 
+    async def save_audio_async(
+        self,
+        audio_data: Union[bytes, memoryview, BinaryIO],
+        test_id: str,
+        call_sid: str,
+        turn_number: int,
+        speaker: str,
+    ) -> str:
+        """
+        Save audio data to S3 from an upload thread so the event loop keeps running.
+
+        Args:
+            audio_data: Audio data as bytes, a memoryview or file-like object
+            test_id: Test case ID
+            call_sid: Call SID
+            turn_number: Conversation turn number
+            speaker: Speaker identifier (evaluator or agent)
+
+        Returns:
+            S3 URL for the saved audio
+        """
+        return await self.run_in_executor(
+            self.save_audio, audio_data, test_id, call_sid, turn_number, speaker
+        )
+
     def save_transcription(
         self,
         transcription: str,
@@ -113,7 +164,7 @@ class S3Service:
             logger.error("Missing test_id when saving transcription")
             return ""
 
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        timestamp = time.strftime("%Y%m%d_%H%M%S")
         key = f"tests/{test_id}/calls/{call_sid}/transcripts/{turn_number}_{speaker}_{timestamp}.txt"
 
         try:
@@ -159,6 +210,36 @@ class S3Service:
             logger.error(traceback.format_exc())
             return ""
 
+    async def save_transcription_async(
+        self,
+        transcription: str,
+        test_id: str,
+        call_sid: str,
+        turn_number: int,
+        speaker: str,
+    ) -> str:
+        """
+        Save a transcription to S3 from an upload thread so the event loop keeps running.
+
+        Args:
+            transcription: Text transcription
+            test_id: Test case ID
+            call_sid: Call SID
+            turn_number: Conversation turn number
+            speaker: Speaker identifier (evaluator or agent)
+
+        Returns:
+            S3 URL for the saved transcription
+        """
+        return await self.run_in_executor(
+            self.save_transcription,
+            transcription,
+            test_id,
+            call_sid,
+            turn_number,
+            speaker,
+        )
+
     def save_report(self, report_data: Dict[str, Any], report_id: str) -> str:
         """
         Save a test report to S3 with consistent path structure.
@@ -395,5 +476,186 @@ class S3Service:
             return ""
 
 
+class RecordingUpload:
+    """
+    Upload a call recording to S3 as a WAV file while the call is in progress.
+
+    g711_ulaw audio is handed over in chunks and only converted to 16 bit PCM
+    as each multipart part is uploaded, so about two parts of ulaw audio are
+    held in memory however long the call runs. Silence is trimmed from the
+    start and end of the whole recording: leading silence is dropped until the
+    first audible chunk, and trailing silence is held back until more audio
+    arrives or the recording finishes. The first part is kept until the end:
+    it carries the WAV header, which needs the final data size, and S3
+    assembles parts by part number rather than upload order. Recordings
+    shorter than two parts are written with a single put_object.
+
+    The recording is named after the time it finishes. Parts of a longer
+    recording are uploaded under a temporary key and copied to that name once
+    the upload completes.
+    """
+
+    # S3 requires every part but the last to be at least 5 MB
+    PART_SIZE = 8 * 1024 * 1024
+    # g711_ulaw bytes that convert to one part of PCM
+    PART_ULAW_SIZE = PART_SIZE // 2
+
+    def __init__(self, s3: S3Service, test_id: str, call_sid: str):
+        self.s3 = s3
+        self.prefix = f"tests/{test_id}/calls/{call_sid}/full_conversation"
+        self.upload_key = f"{self.prefix}_{time.strftime('%Y%m%d_%H%M%S')}.upload"
+        self.upload_id = None
+        self.parts: List[Dict[str, Any]] = []
+        self._head = bytearray()
+        self._pending = bytearray()
+        self._silence = bytearray()
+        self._audible = False
+        self._data_size = 0
+        self._failed = False
+        # Chunks are processed on the upload threads, one at a time and in order
+        self._lock = asyncio.Lock()
+
+    async def add_audio(self, audio_data: Union[bytes, memoryview]):
+        """Add a chunk of the recording and upload any parts it completes."""
+        async with self._lock:
+            await self.s3.run_in_executor(self._add_audio, audio_data)
+
+    async def finish(self, audio_data: Union[bytes, memoryview]) -> str:
+        """
+        Add the last chunk of the recording and complete the upload.
+
+        Args:
+            audio_data: Remaining g711_ulaw audio
+
+        Returns:
+            S3 URL of the recording, or an empty string if the upload failed
+        """
+        async with self._lock:
+            return await self.s3.run_in_executor(self._finish, audio_data)
+
+    def _add_audio(self, audio_data: Union[bytes, memoryview]):
+        if self._failed:
+            return
+        try:
+            start, end = audible_range(audio_data)
+            if start == end:
+                if self._audible:
+                    self._silence += audio_data
+                return
+
+            if self._audible:
+                self._append(self._silence)
+                self._silence.clear()
+            self._audible = True
+            self._append(memoryview(audio_data)[start:end])
+            self._silence += memoryview(audio_data)[end:]
+        except Exception as e:
+            logger.error(f"Error streaming full conversation recording: {str(e)}")
+            self._abort()
+
+    def _append(self, ulaw_audio):
+        """Add audible ulaw audio, uploading every part it completes."""
+        self._data_size += 2 * len(ulaw_audio)
+
+        # Fill the first part before queuing anything for upload
+        take = self.PART_ULAW_SIZE - len(self._head)
+        if take > 0:
+            self._head += ulaw_audio[:take]
+            ulaw_audio = ulaw_audio[take:]
+        self._pending += ulaw_audio
+
+        while len(self._pending) >= self.PART_ULAW_SIZE:
+            self._upload_part(
+                audioop.ulaw2lin(memoryview(self._pending)[: self.PART_ULAW_SIZE], 2)
+            )
+            del self._pending[: self.PART_ULAW_SIZE]
+
+    def _finish(self, audio_data: Union[bytes, memoryview]) -> str:
+        if len(audio_data):
+            self._add_audio(audio_data)
+        if self._failed:
+            return ""
+
+        try:
+            # Whatever silence is still held back ends the recording
+            self._silence.clear()
+            key = f"{self.prefix}_{time.strftime('%Y%m%d_%H%M%S')}.wav"
+            header = wav_header(self._data_size)
+            head = header + audioop.ulaw2lin(self._head, 2)
+            if self.upload_id is None:
+                self.s3.s3_client.put_object(
+                    Bucket=self.s3.bucket_name,
+                    Key=key,
+                    Body=head + audioop.ulaw2lin(self._pending, 2),
+                    ContentType="audio/wav",
+                )
+            else:
+                if self._pending:
+                    self._upload_part(audioop.ulaw2lin(self._pending, 2))
+                self._upload_part(head, part_number=1)
+                self.s3.s3_client.complete_multipart_upload(
+                    Bucket=self.s3.bucket_name,
+                    Key=self.upload_key,
+                    UploadId=self.upload_id,
+                    MultipartUpload={
+                        "Parts": sorted(self.parts, key=lambda p: p["PartNumber"])
+                    },
+                )
+                self.upload_id = None
+                self.s3.s3_client.copy_object(
+                    Bucket=self.s3.bucket_name,
+                    Key=key,
+                    CopySource={"Bucket": self.s3.bucket_name, "Key": self.upload_key},
+                    ContentType="audio/wav",
+                    MetadataDirective="REPLACE",
+                )
+                self.s3.s3_client.delete_object(
+                    Bucket=self.s3.bucket_name, Key=self.upload_key
+                )
+
+            s3_url = f"s3://{self.s3.bucket_name}/{key}"
+            logger.info(
+                f"Full conversation recording saved to: {s3_url}, size: {len(header) + self._data_size} bytes"
+            )
+            return s3_url
+        except Exception as e:
+            logger.error(f"Error saving full conversation recording: {str(e)}")
+            self._abort()
+            return ""
+        finally:
+            self._head = bytearray()
+            self._pending = bytearray()
+
+    def _upload_part(self, data, part_number: int = None):
+        """Upload one part, numbering streamed parts from 2 so part 1 stays free."""
+        if self.upload_id is None:
+            response = self.s3.s3_client.create_multipart_upload(
+                Bucket=self.s3.bucket_name, Key=self.upload_key, ContentType="audio/wav"
+            )
+            self.upload_id = response["UploadId"]
+        if part_number is None:
+            part_number = len(self.parts) + 2
+        response = self.s3.s3_client.upload_part(
+            Bucket=self.s3.bucket_name,
+            Key=self.upload_key,
+            UploadId=self.upload_id,
+            PartNumber=part_number,
+            Body=bytes(data),
+        )
+        self.parts.append({"PartNumber": part_number, "ETag": response["ETag"]})
+
+    def _abort(self):
+        self._failed = True
+        if self.upload_id is not None:
+            try:
+                self.s3.s3_client.abort_multipart_upload(
+                    Bucket=self.s3.bucket_name,
+                    Key=self.upload_key,
+                    UploadId=self.upload_id,
+                )
+            except Exception as e:
+                logger.error(f"Error aborting recording upload: {str(e)}")
+
+
 # Create a singleton instance
 s3_service = S3Service()
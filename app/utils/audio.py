@@ -1,10 +1,155 @@
 # app/utils/audio.py
+import base64
+import binascii
 import logging
 import audioop
+from typing import List, Tuple
+from collections import deque
 from pydub import AudioSegment
 
 logger = logging.getLogger(__name__)
 
+# 30 seconds of 8kHz g711_ulaw audio, enough to hold a typical turn without regrowing
+DEFAULT_TURN_BYTES = 8000 * 30
+
+
+class BufferPool:
+    """
+    Free list of bytearrays shared by every call.
+
+    Audio buffers take their storage from the pool and hand it back once the
+    audio has been uploaded, so steady-state calls reuse a small set of
+    allocations instead of creating and discarding one per turn.
+    """
+
+    def __init__(self, max_buffers: int = 32):
+        self.max_buffers = max_buffers
+        self._free = deque()
+
+    def acquire(self, size: int) -> bytearray:
+        """Return the smallest free buffer of at least size bytes, allocating one if none fits."""
+        best = None
+        for index, buffer in enumerate(self._free):
+            if len(buffer) >= size and (
+                best is None or len(buffer) < len(self._free[best])
+            ):
+                best = index
+        if best is None:
+            return bytearray(size)
+        buffer = self._free[best]
+        del self._free[best]
+        return buffer
+
+    def release(self, buffer: bytearray):
+        """Return a buffer to the pool, dropping it if the pool is full."""
+        if len(self._free) < self.max_buffers:
+            self._free.append(buffer)
+
+
+audio_buffer_pool = BufferPool()
+
+
+def release_audio(audio: memoryview):
+    """Return the storage behind a detached audio view to the pool."""
+    buffer = audio.obj
+    try:
+        audio.release()
+        # Views sliced from the audio share its storage without blocking the
+        # release above, but they do block resizing the buffer
+        buffer.append(0)
+        buffer.pop()
+    except BufferError:
+        # Still referenced by a derived view, leave it to the garbage collector
+        return
+    audio_buffer_pool.release(buffer)
+
+
+class AudioBuffer:
+    """
+    Pre-sized byte buffer for accumulating audio frames.
+
+    Frames are copied into a preallocated bytearray behind a length cursor, so
+    appending a frame never reallocates until the capacity is exceeded and
+    clearing the buffer keeps its storage for the next turn. Base64 frames can
+    be queued as-is and are only decoded when the audio is read.
+    """
+
+    def __init__(self, capacity: int = DEFAULT_TURN_BYTES):
+        self._capacity = capacity
+        self._buffer = audio_buffer_pool.acquire(capacity)
+        self._length = 0
+        self._pending: List[str] = []
+        self._pending_length = 0
+
+    def __len__(self) -> int:
+        return self._length + self._pending_length
+
+    def __bytes__(self) -> bytes:
+        return bytes(self.view())
+
+    def extend(self, data: bytes):
+        """Append a frame, doubling the capacity if it does not fit."""
+        if self._pending:
+            self._decode_pending()
+        self._write(data)
+
+    def extend_b64(self, payload: str):
+        """Queue a base64 encoded frame without decoding it."""
+        self._pending.append(payload)
+        self._pending_length += len(payload) // 4 * 3 - payload[-2:].count("=")
+
+    def _decode_pending(self):
+        """Decode queued base64 frames into the buffer."""
+        for payload in self._pending:
+            try:
+                self._write(base64.b64decode(payload))
+            except (binascii.Error, ValueError):
+                logger.error("Error decoding audio payload")
+        self._pending.clear()
+        self._pending_length = 0
+
+    def _write(self, data: bytes):
+        end = self._length + len(data)
+        if end > len(self._buffer):
+            # Copy into new storage rather than resizing in place, which fails
+            # while a view of the old storage is still exported
+            grown = bytearray(max(end, 2 * len(self._buffer)))
+            grown[: self._length] = memoryview(self._buffer)[: self._length]
+            self._buffer = grown
+        self._buffer[self._length : end] = data
+        self._length = end
+
+    def view(self) -> memoryview:
+        """Return a zero-copy view of the accumulated audio."""
+        if self._pending:
+            self._decode_pending()
+        return memoryview(self._buffer)[: self._length]
+
+    def detach(self) -> memoryview:
+        """
+        Hand over the accumulated audio without copying it.
+
+        The returned view keeps the current storage alive, and the buffer
+        continues on storage from the pool, so the audio can be uploaded while
+        new frames arrive. Pass the view to release_audio once it is uploaded.
+        """
+        audio = self.view()
+        self._buffer = audio_buffer_pool.acquire(self._capacity)
+        self._length = 0
+        return audio
+
+    def clear(self):
+        """Discard the accumulated audio while keeping the allocated storage."""
+        self._length = 0
+        self._pending.clear()
+        self._pending_length = 0
+
+    def release(self):
+        """Return the storage to the pool once the buffer is no longer needed."""
+        self.clear()
+        audio_buffer_pool.release(self._buffer)
+        self._buffer = bytearray()
+
 
 def trim_silence(
     audio_data: bytes,
@@ -60,3 +205,33 @@ def trim_silence(
     except Exception as e:
         logger.error(f"Error in trim_silence: {e}")
         return audio_data  # Fallback to original if any error occurs
+
+
+def audible_range(
+    audio_data: bytes, silence_thresh: float = -40.0, chunk_size: int = 10
+) -> Tuple[int, int]:
+    """
+    Find the audio between the first and last chunk that is not silent.
+
+    Args:
+        audio_data (bytes): g711_ulaw audio at 8kHz.
+        silence_thresh (float): Silence threshold in dBFS (default -40 dBFS).
+        chunk_size (int): Chunk size in milliseconds for silence detection.
+
+    Returns:
+        Tuple[int, int]: Start and end offsets into audio_data, equal if the
+        audio is entirely silent.
+    """
+    pcm_audio = audioop.ulaw2lin(audio_data, 2)
+    threshold = 32768 * 10 ** (silence_thresh / 20)
+    chunk_bytes = 8 * chunk_size
+
+    audible = [
+        offset
+        for offset in range(0, len(audio_data), chunk_bytes)
+        if audioop.rms(pcm_audio[2 * offset : 2 * (offset + chunk_bytes)], 2)
+        > threshold
+    ]
+    if not audible:
+        return len(audio_data), len(audio_data)
+    return audible[0], min(audible[-1] + chunk_bytes, len(audio_data))
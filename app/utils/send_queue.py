@@ -0,0 +1,56 @@
+# app/utils/send_queue.py
+import asyncio
+from typing import Awaitable, Callable
+
+
+class SendQueue:
+    """
+    Ordered outgoing messages for a websocket, written by a single task.
+
+    Producers never wait on the socket. The queue itself is unbounded; instead
+    it counts the bytes that have been queued but not yet written, including
+    the message currently being sent. A send only completes once the transport
+    has accepted the data, so that count only grows past the limit when the
+    peer stops keeping up, not when a burst of messages is queued before the
+    writer gets to run.
+    """
+
+    def __init__(self, max_pending_bytes: int):
+        """
+        Args:
+            max_pending_bytes: Unwritten bytes above which the socket is
+                considered congested
+        """
+        self.max_pending_bytes = max_pending_bytes
+        self.pending_bytes = 0
+        self._messages = asyncio.Queue()
+
+    @property
+    def congested(self) -> bool:
+        return self.pending_bytes > self.max_pending_bytes
+
+    def put(self, message: str):
+        """Queue a message regardless of congestion."""
+        self._messages.put_nowait(message)
+        self.pending_bytes += len(message)
+
+    def offer(self, message: str) -> bool:
+        """Queue a message unless the socket is congested, returning whether it was queued."""
+        if self.congested:
+            return False
+        self.put(message)
+        return True
+
+    def clear(self):
+        """Discard every message that has not started sending."""
+        while not self._messages.empty():
+            self.pending_bytes -= len(self._messages.get_nowait())
+
+    async def run(self, send: Callable[[str], Awaitable[None]]):
+        """Send queued messages in order until cancelled or send fails."""
+        while True:
+            message = await self._messages.get()
+            try:
+                await send(message)
+            finally:
+                self.pending_bytes -= len(message)
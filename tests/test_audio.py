@@ -0,0 +1,71 @@
+import audioop
+import math
+import struct
+
+import pytest
+
+pytest.importorskip("pydub")
+
+from app.utils.audio import AudioBuffer, BufferPool, audible_range, release_audio
+from app.utils import audio
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    pool = BufferPool(max_buffers=4)
+    monkeypatch.setattr(audio, "audio_buffer_pool", pool)
+    return pool
+
+
+def ulaw_silence(samples):
+    return audioop.lin2ulaw(b"\0\0" * samples, 2)
+
+
+def ulaw_tone(samples):
+    pcm = b"".join(
+        struct.pack("<h", int(8000 * math.sin(i / 3))) for i in range(samples)
+    )
+    return audioop.lin2ulaw(pcm, 2)
+
+
+def test_detach_hands_over_audio_and_continues_on_new_storage(pool):
+    buffer = AudioBuffer(capacity=16)
+    buffer.extend(b"first")
+    detached = buffer.detach()
+    buffer.extend(b"second")
+
+    assert bytes(detached) == b"first"
+    assert bytes(buffer) == b"second"
+    assert detached.obj is not buffer.view().obj
+
+
+def test_release_audio_returns_storage_to_the_pool(pool):
+    buffer = AudioBuffer(capacity=16)
+    buffer.extend(b"audio")
+    detached = buffer.detach()
+    storage = detached.obj
+
+    release_audio(detached)
+
+    assert pool.acquire(16) is storage
+
+
+def test_release_audio_leaves_storage_still_in_use(pool):
+    buffer = AudioBuffer(capacity=16)
+    buffer.extend(b"audio")
+    detached = buffer.detach()
+    derived = detached[1:]
+
+    release_audio(detached)
+
+    assert bytes(derived) == b"udio"
+    assert pool.acquire(16) is not derived.obj
+
+
+def test_audible_range_skips_leading_and_trailing_silence():
+    recording = ulaw_silence(800) + ulaw_tone(800) + ulaw_silence(800)
+    assert audible_range(recording) == (800, 1600)
+
+
+def test_audible_range_of_silence_is_empty():
+    assert audible_range(ulaw_silence(800)) == (800, 800)
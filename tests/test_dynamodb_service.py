@@ -0,0 +1,117 @@
+import pytest
+
+pytest.importorskip("boto3")
+
+from app.services import dynamodb_service as dynamodb_module
+from app.services.dynamodb_service import DynamoDBService
+
+
+class FakeTable:
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.items = []
+
+    def put_item(self, Item):
+        if self.fail:
+            raise RuntimeError("put failed")
+        self.items.append(Item)
+
+
+class FakeClient:
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.requests = []
+
+    def batch_write_item(self, RequestItems):
+        self.requests.append(RequestItems)
+        response = self.responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+
+class FakeMeta:
+    def __init__(self, client):
+        self.client = client
+
+
+class FakeResource:
+    def __init__(self, client):
+        self.meta = FakeMeta(client)
+
+
+@pytest.fixture
+def service(monkeypatch):
+    service = DynamoDBService("tests-table")
+    service.table = FakeTable()
+    monkeypatch.setattr(dynamodb_module.time, "sleep", lambda seconds: None)
+    return service
+
+
+def use_client(service, *responses):
+    client = FakeClient(responses)
+    service.dynamodb = FakeResource(client)
+    return client
+
+
+def test_unchanged_save_is_skipped(service):
+    test_data = {"status": "running", "conversation": []}
+
+    assert service.save_test("test-1", test_data)
+    assert service.save_test("test-1", test_data)
+
+    assert len(service.table.items) == 1
+
+
+def test_failed_put_is_retried_by_the_next_save(service):
+    test_data = {"status": "running", "conversation": []}
+    service.table.fail = True
+
+    assert not service.save_test("test-1", test_data)
+    service.table.fail = False
+    assert service.save_test("test-1", test_data)
+
+    assert len(service.table.items) == 1
+
+
+def test_failed_batch_is_retried_by_the_next_save(service):
+    test_data = {"status": "running", "conversation": []}
+    item = service._build_test_item("test-1", test_data)
+    assert service._is_changed("test-1", item)
+    use_client(service, RuntimeError("batch failed"))
+
+    assert not service._batch_write_items([item])
+    assert service._is_changed("test-1", item)
+
+
+def test_throttled_items_are_retried(service):
+    items = [
+        service._build_test_item(test_id, {"status": "running"})
+        for test_id in ("test-1", "test-2")
+    ]
+    unprocessed = {"PutRequest": {"Item": items[1]}}
+    client = use_client(
+        service,
+        {"UnprocessedItems": {"tests-table": [unprocessed]}},
+        {"UnprocessedItems": {}},
+    )
+
+    assert service._batch_write_items(items)
+    assert client.requests[1] == {"tests-table": [unprocessed]}
+
+
+def test_items_still_throttled_after_retries_are_forgotten(service):
+    items = [
+        service._build_test_item(test_id, {"status": "running"})
+        for test_id in ("test-1", "test-2")
+    ]
+    for item in items:
+        service._is_changed(item["test_id"], item)
+    unprocessed = {
+        "UnprocessedItems": {"tests-table": [{"PutRequest": {"Item": items[1]}}]}
+    }
+    use_client(service, *[unprocessed] * service.BATCH_MAX_ATTEMPTS)
+
+    assert not service._batch_write_items(items)
+    assert not service._is_changed("test-1", items[0])
+    assert service._is_changed("test-2", items[1])
@@ -0,0 +1,134 @@
+import asyncio
+import audioop
+import math
+import struct
+
+import pytest
+
+pytest.importorskip("boto3")
+pytest.importorskip("pydub")
+
+from app.services.s3_service import RecordingUpload, wav_header
+
+
+class FakeS3Client:
+    """Record the calls made to S3 in order."""
+
+    def __init__(self):
+        self.calls = []
+        self.parts = {}
+
+    def put_object(self, **kwargs):
+        self.calls.append(("put_object", kwargs))
+
+    def create_multipart_upload(self, **kwargs):
+        self.calls.append(("create_multipart_upload", kwargs))
+        return {"UploadId": "upload-1"}
+
+    def upload_part(self, **kwargs):
+        self.calls.append(("upload_part", kwargs))
+        self.parts[kwargs["PartNumber"]] = kwargs["Body"]
+        return {"ETag": f"etag-{kwargs['PartNumber']}"}
+
+    def complete_multipart_upload(self, **kwargs):
+        self.calls.append(("complete_multipart_upload", kwargs))
+
+    def copy_object(self, **kwargs):
+        self.calls.append(("copy_object", kwargs))
+
+    def delete_object(self, **kwargs):
+        self.calls.append(("delete_object", kwargs))
+
+    def abort_multipart_upload(self, **kwargs):
+        self.calls.append(("abort_multipart_upload", kwargs))
+
+
+class FakeS3:
+    bucket_name = "bucket"
+
+    def __init__(self):
+        self.s3_client = FakeS3Client()
+
+    async def run_in_executor(self, func, *args):
+        return func(*args)
+
+
+def ulaw_silence(samples):
+    return audioop.lin2ulaw(b"\0\0" * samples, 2)
+
+
+def ulaw_tone(samples):
+    pcm = b"".join(
+        struct.pack("<h", int(8000 * math.sin(i / 3))) for i in range(samples)
+    )
+    return audioop.lin2ulaw(pcm, 2)
+
+
+@pytest.fixture
+def small_parts(monkeypatch):
+    monkeypatch.setattr(RecordingUpload, "PART_SIZE", 1600)
+    monkeypatch.setattr(RecordingUpload, "PART_ULAW_SIZE", 800)
+
+
+def record(chunks):
+    s3 = FakeS3()
+    upload = RecordingUpload(s3, "test-1", "CA1")
+
+    async def scenario():
+        for chunk in chunks[:-1]:
+            await upload.add_audio(chunk)
+        return await upload.finish(chunks[-1])
+
+    return s3.s3_client, asyncio.run(scenario())
+
+
+def test_short_recording_is_written_with_one_put(small_parts):
+    client, url = record([ulaw_tone(400), b""])
+
+    [(name, kwargs)] = client.calls
+    assert name == "put_object"
+    assert url == f"s3://bucket/{kwargs['Key']}"
+    assert kwargs["Key"].startswith("tests/test-1/calls/CA1/full_conversation_")
+    assert kwargs["Body"] == wav_header(800) + audioop.ulaw2lin(ulaw_tone(400), 2)
+
+
+def test_header_part_is_uploaded_last_as_part_one(small_parts):
+    tone = ulaw_tone(3000)
+    client, url = record([tone[:1000], tone[1000:2500], tone[2500:]])
+
+    names = [name for name, _ in client.calls]
+    assert names == [
+        "create_multipart_upload",
+        "upload_part",
+        "upload_part",
+        "upload_part",
+        "upload_part",
+        "complete_multipart_upload",
+        "copy_object",
+        "delete_object",
+    ]
+    part_numbers = [
+        kwargs["PartNumber"] for name, kwargs in client.calls if name == "upload_part"
+    ]
+    assert part_numbers == [2, 3, 4, 1]
+
+    completed = client.calls[5][1]["MultipartUpload"]["Parts"]
+    assert [part["PartNumber"] for part in completed] == [1, 2, 3, 4]
+    body = b"".join(client.parts[number] for number in sorted(client.parts))
+    assert body == wav_header(6000) + audioop.ulaw2lin(tone, 2)
+
+    copy = client.calls[6][1]
+    assert copy["CopySource"]["Key"] == client.calls[0][1]["Key"]
+    assert url == f"s3://bucket/{copy['Key']}"
+    assert copy["Key"].endswith(".wav")
+
+
+def test_only_the_ends_of_the_recording_are_trimmed(small_parts):
+    # Sizes are whole 10 ms windows, the resolution of the silence detection
+    tone = ulaw_tone(240)
+    pause = ulaw_silence(160)
+    client, _ = record([pause + tone, pause, tone + pause, b""])
+
+    [(_, kwargs)] = client.calls
+    expected = audioop.ulaw2lin(tone + pause + tone, 2)
+    assert kwargs["Body"] == wav_header(len(expected)) + expected
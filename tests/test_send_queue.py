@@ -0,0 +1,73 @@
+import asyncio
+
+from app.utils.send_queue import SendQueue
+
+# Roughly the size of a Twilio media message carrying one OpenAI audio delta
+DELTA_MESSAGE = (
+    '{"event":"media","streamSid":"MZ0","media":{"payload":"' + ("A" * 2136) + '"}}'
+)
+MARK_MESSAGE = '{"event":"mark","streamSid":"MZ0","mark":{"name":"responsePart"}}'
+
+
+def test_burst_of_buffered_deltas_is_not_dropped():
+    async def scenario():
+        queue = SendQueue(2**20)
+        sent = []
+
+        async def send(message):
+            sent.append(message)
+
+        writer = asyncio.create_task(queue.run(send))
+
+        # Queue a whole burst without yielding, as the evaluator loop does when
+        # several OpenAI frames are already buffered
+        expected = []
+        for _ in range(200):
+            assert queue.offer(DELTA_MESSAGE)
+            queue.put(MARK_MESSAGE)
+            expected += [DELTA_MESSAGE, MARK_MESSAGE]
+
+        while queue.pending_bytes:
+            await asyncio.sleep(0)
+        writer.cancel()
+        return sent, expected
+
+    sent, expected = asyncio.run(scenario())
+    assert sent == expected
+
+
+def test_deltas_are_dropped_while_the_socket_is_blocked():
+    async def scenario():
+        queue = SendQueue(10 * len(DELTA_MESSAGE))
+        writable = asyncio.Event()
+        sent = []
+
+        async def send(message):
+            await writable.wait()
+            sent.append(message)
+
+        writer = asyncio.create_task(queue.run(send))
+        accepted = 0
+        for _ in range(50):
+            accepted += queue.offer(DELTA_MESSAGE)
+            await asyncio.sleep(0)
+        assert queue.congested
+
+        writable.set()
+        while queue.pending_bytes:
+            await asyncio.sleep(0)
+        assert queue.offer(DELTA_MESSAGE)
+        writer.cancel()
+        return accepted, sent
+
+    accepted, sent = asyncio.run(scenario())
+    assert accepted == 11
+    assert len(sent) == accepted
+
+
+def test_clear_discards_unsent_messages():
+    queue = SendQueue(2**20)
+    queue.put(DELTA_MESSAGE)
+    queue.put(MARK_MESSAGE)
+    queue.clear()
+    assert queue.pending_bytes == 0